@@ -0,0 +1,132 @@
+import csv
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+from .schema_inference import read_csv_header, coerce_table, empty_csv_table
+
+logger = logging.getLogger(__name__)
+
+# Size of the byte ranges handed to worker processes; several ranges per worker keep them all busy
+CSV_RANGE_BYTES = int(os.environ.get("CSV_RANGE_BYTES", 64 * 1024 * 1024))
+MIN_RANGE_BYTES = 1024 * 1024
+
+# Most worker processes one CSV ingestion may spawn; each imports pyarrow and holds ranges in memory
+CSV_MAX_WORKERS = int(os.environ.get("CSV_MAX_WORKERS", os.cpu_count() or 1))
+
+# Lines checked after a candidate boundary to make sure it is not inside a quoted field
+BOUNDARY_PROBE_LINES = 8
+BOUNDARY_MAX_ATTEMPTS = 100
+
+
+def _is_record_start(f, width):
+    """Check that the next lines parse as complete rows of the expected width"""
+    position = f.tell()
+    lines = [f.readline() for _ in range(BOUNDARY_PROBE_LINES)]
+    f.seek(position)
+    text = b"".join(lines).decode("utf-8", errors="replace")
+    rows = list(csv.reader(io.StringIO(text, newline="")))
+    # The last row may be cut short by the probe window, so only complete ones are checked
+    complete = rows[:-1] if len(rows) > 1 else rows
+    return bool(complete) and all(len(row) == width for row in complete)
+
+
+def split_csv_ranges(file_path, range_bytes, width, start=None):
+    """Split the data section of a CSV file, or its rest from a record boundary, into record-aligned byte ranges"""
+    file_size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        f.readline()  # Header
+        boundaries = [f.tell() if start is None else start]
+        target = boundaries[0] + range_bytes
+        while target < file_size:
+            f.seek(target)
+            f.readline()  # Move to the start of the next line
+            for _ in range(BOUNDARY_MAX_ATTEMPTS):
+                if f.tell() >= file_size or _is_record_start(f, width):
+                    break
+                f.readline()
+            if f.tell() >= file_size:
+                break
+            if f.tell() > boundaries[-1]:
+                boundaries.append(f.tell())
+            target = f.tell() + range_bytes
+        boundaries.append(file_size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+def parse_csv_range(file_path, start, end, headers, schema_fields):
+    """Parse one byte range into a typed Arrow table; runs inside a worker process"""
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    table = pa_csv.read_csv(
+        pa.BufferReader(data),
+        read_options=pa_csv.ReadOptions(column_names=headers, use_threads=False),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={header: pa.string() for header in headers},
+            strings_can_be_null=False,
+            quoted_strings_can_be_null=False
+        )
+    )
+    table, errors = coerce_table(table, schema_fields)
+    return table, errors, end - start
+
+
+def ingest_csv_parallel(file_path, writer, schema_fields, workers, on_progress=None, range_bytes=None, start_offset=None):
+    """Parse a CSV file in a process pool and write the ranges to the writer in file order.
+
+    At most two ranges per worker are in flight, so memory stays bounded by the range size.
+    on_progress(rows, bytes_done) is called after each range is written; bytes_done is then
+    the record boundary where the next range starts, so it can be used as a resume offset.
+    An exception raised by on_progress stops the parse.
+    start_offset resumes from such a boundary. Returns the row count and per-column coercion errors.
+    """
+    # Requests are validated against the same limit; stored jobs may predate a lower one
+    workers = max(min(workers, CSV_MAX_WORKERS), 1)
+    headers = read_csv_header(file_path)
+    file_size = os.path.getsize(file_path)
+    if range_bytes is None:
+        range_bytes = max(min(CSV_RANGE_BYTES, file_size // (workers * 4) or 1), MIN_RANGE_BYTES)
+    ranges = split_csv_ranges(file_path, range_bytes, len(headers), start_offset)
+    logger.info(f"Parsing {len(ranges)} byte ranges of {file_path} with {workers} worker processes")
+
+    rows = 0
+    bytes_done = ranges[0][0] if ranges else file_size
+    coercion_errors = {}
+
+    # Spawned workers do not inherit the API process's threads, locks or open sessions
+    context = multiprocessing.get_context("spawn")
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    try:
+        pending = []
+        next_range = 0
+        while next_range < len(ranges) or pending:
+            while next_range < len(ranges) and len(pending) < workers * 2:
+                start, end = ranges[next_range]
+                pending.append(pool.submit(parse_csv_range, file_path, start, end, headers, schema_fields))
+                next_range += 1
+
+            # Results are consumed in submission order so row groups follow the file order
+            table, errors, size = pending.pop(0).result()
+            writer.write_table(table)
+            rows += table.num_rows
+            bytes_done += size
+            for column, count in errors.items():
+                coercion_errors[column] = coercion_errors.get(column, 0) + count
+            if on_progress:
+                on_progress(rows, bytes_done)
+    finally:
+        # If on_progress raised (e.g. the job was cancelled), queued ranges are dropped
+        # and only the ranges already being parsed are waited for
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    if writer.schema is None:
+        # A file with only a header has no ranges; still produce a readable file with its columns
+        writer.write_table(empty_csv_table(headers, schema_fields))
+    return rows, coercion_errors
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File, Form, BackgroundTasks, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File, Form, Query
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional, Union
-from fastapi.responses import FileResponse
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
 import random
 import uuid
 from datetime import datetime, timedelta
@@ -12,20 +14,51 @@ import tempfile
 import shutil
 from pathlib import Path
 import sqlalchemy
-from sqlalchemy import create_engine, MetaData, Table, inspect, desc, func, and_, or_
+from sqlalchemy import MetaData, Table, desc, func, and_, or_, select
 import requests
 import asyncio
 import threading
-import time
 import logging
 import pandas as pd
 import numpy as np
-from pydantic import BaseModel, Field
+import pyarrow as pa
+from pydantic import BaseModel, Field, ValidationError
 
 from .models import User, get_db, ActivityLog, Role, UploadedFile, IngestionJob
 from .auth import get_current_active_user, has_role, has_permission, log_activity
 from .data_models import DataSource, DataMetrics, Activity, DashboardData
 from .models import get_db, SessionLocal
+from .parquet_writer import PartParquetWriter, remove_partial_output
+from .csv_ingest import ingest_csv_parallel, CSV_MAX_WORKERS
+from .exports import export_parquet
+from .throttle import RateLimiter
+from .job_control import (
+    JobCancelled, ProgressTracker, mark_job_active, mark_job_inactive, is_job_active, request_cancel,
+    check_cancelled, cancel_stop_seconds, watch_cancellations, get_live_progress
+)
+from .job_events import job_event_bus, JOB_EVENTS_KEEPALIVE_SECONDS
+from .scheduler import (
+    IngestionScheduler, queue_position, queue_wait_seconds, queue_depth_by_user, queued_jobs, order_queue,
+    running_counts
+)
+from .schema_inference import (
+    infer_csv_schema, sample_json_records, head_json_records, sample_ndjson_records, json_value_types,
+    type_confidence, coerce_table, open_csv_reader, read_csv_header, records_to_table, flatten_record,
+    resolve_json_type, unseen_fields, empty_csv_table
+)
+from .json_stream import (
+    iter_json_batches, json_document_start, read_json_values, read_json_members, read_ndjson_values
+)
+from .db_sources import (
+    get_engine, get_required_db_fields, create_connection_string, seal_source_config, open_source_config,
+    get_cached_table_names, get_cached_columns, invalidate_schema_cache
+)
+from .db_extract import (
+    reflect_table, estimate_row_count, discover_key_columns,
+    iter_keyset_batches, iter_offset_batches, iter_streaming_batches,
+    plan_key_ranges, extract_ranges_parallel, last_key_values, encode_key_values, decode_key_values,
+    arrow_column_types, batch_to_table, can_partition, MAX_PARALLEL_WORKERS
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -42,6 +75,18 @@ UPLOAD_DIR.mkdir(exist_ok=True)
 DATA_DIR = Path(__file__).parent / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
+# Bytes a JSON object preview may read before returning the keys decoded so far
+PREVIEW_MAX_BYTES = 1 << 20
+
+# Rows written between durable checkpoints of a running ingestion job
+CHECKPOINT_ROWS = int(os.environ.get("INGEST_CHECKPOINT_ROWS", 100_000))
+
+# Seconds /cancel-job waits for a running worker to stop before answering
+CANCEL_WAIT_SECONDS = float(os.environ.get("INGEST_CANCEL_WAIT_SECONDS", 10))
+
+# Most jobs a single /job-events stream may watch
+MAX_WATCHED_JOBS = 100
+
 # Functions to interact with the database
 def get_uploaded_file(db, file_id):
     """Get uploaded file from database"""
@@ -97,11 +142,11 @@ def save_ingestion_job(db, job_id, job_data):
     if existing_job:
         # Update existing job
         for key, value in job_data.items():
-            if key == 'config' and value:
+            if key in ('config', 'metrics', 'checkpoint', 'source_config') and value:
                 setattr(existing_job, key, json.dumps(value))
             elif key == 'start_time' and value:
                 setattr(existing_job, key, datetime.fromisoformat(value))
-            elif key == 'end_time' and value:
+            elif key in ('end_time', 'queued_at') and value:
                 setattr(existing_job, key, datetime.fromisoformat(value))
             else:
                 setattr(existing_job, key, value)
@@ -119,13 +164,66 @@ def save_ingestion_job(db, job_id, job_data):
             details=job_data.get('details'),
             error=job_data.get('error'),
             duration=job_data.get('duration'),
-            config=config_json
+            config=config_json,
+            metrics=json.dumps(job_data['metrics']) if job_data.get('metrics') else None,
+            source_config=json.dumps(job_data['source_config']) if job_data.get('source_config') else None,
+            queued_at=datetime.fromisoformat(job_data['queued_at']) if job_data.get('queued_at') else None,
+            owner=job_data.get('owner'),
+            owner_role=job_data.get('owner_role'),
+            priority=job_data.get('priority', 0)
         )
         db.add(new_job)
     
     db.commit()
     return True
 
+def update_job_metrics(job, metrics):
+    """Merge values into an ingestion job's JSON metrics"""
+    current = json.loads(job.metrics) if job.metrics else {}
+    current.update(metrics)
+    job.metrics = json.dumps(current)
+
+def load_checkpoint(job):
+    """Get the last durable checkpoint of an ingestion job, or an empty dict"""
+    return json.loads(job.checkpoint) if job.checkpoint else {}
+
+def save_checkpoint(job, writer, **position):
+    """Commit the rows written so far and record them with the matching input position"""
+    position["parts"] = writer.commit()
+    job.checkpoint = json.dumps(position)
+
+def record_job_cancelled(db_session, job_id):
+    """Mark a job cancelled, drop its partial output and record how long the worker took to stop"""
+    stop_seconds = cancel_stop_seconds(job_id)
+    remove_partial_output(DATA_DIR / f"{job_id}.parquet")
+    
+    job = get_ingestion_job(db_session, job_id)
+    job.status = "failed"
+    job.error = "Job cancelled by user"
+    job.end_time = datetime.now()
+    job.duration = str(job.end_time - job.start_time)
+    job.checkpoint = None
+    job.source_config = None
+    if stop_seconds is not None:
+        update_job_metrics(job, {"cancel_stop_seconds": stop_seconds})
+        logger.info(f"Job {job_id} stopped {stop_seconds}s after it was cancelled")
+    db_session.commit()
+
+def get_file_schema_fields(db, file_info, sample_size=1000):
+    """Get the schema fields stored for an uploaded file, detecting and storing them if missing"""
+    if file_info.schema:
+        try:
+            return json.loads(file_info.schema).get("fields", [])
+        except (json.JSONDecodeError, AttributeError):
+            logger.warning(f"Ignoring unreadable stored schema for file {file_info.id}")
+    
+    if file_info.type in ("json", "jsonl"):
+        schema = detect_json_schema(file_info.path, sample_size, "stratified")
+    else:
+        schema = detect_csv_schema(file_info.path, sample_size, "stratified")
+    save_uploaded_file(db, file_info.id, {"schema": schema})
+    return schema["fields"]
+
 # Models for API requests
 class DatabaseConfig(BaseModel):
     type: str
@@ -133,10 +231,25 @@ class DatabaseConfig(BaseModel):
     chunk_size: int = 1000
     connection_name: str
 
+class DatabaseExtractionOptions(BaseModel):
+    """Optional extraction settings read from the free-form config of a database ingestion"""
+    extraction_mode: str = Field("auto", pattern="^(auto|offset|stream)$")  # Keyset else OFFSET, OFFSET, or one cursor
+    parallel_workers: int = Field(1, ge=1, le=MAX_PARALLEL_WORKERS)  # Range readers, each with its own connection
+    partition_column: Optional[str] = Field(None, min_length=1)  # Integer or datetime column split into ranges
+    max_rows_per_second: Optional[float] = Field(None, gt=0)  # Optional throttle; unthrottled by default
+    max_bytes_per_second: Optional[float] = Field(None, gt=0)
+
 class FileIngestionRequest(BaseModel):
     file_id: str
     file_name: str
     chunk_size: int = 1000
+    workers: int = Field(1, ge=1, le=CSV_MAX_WORKERS)  # Processes parsing byte ranges of a CSV upload in parallel
+    engine: str = Field("pandas", pattern="^(pandas|arrow)$")  # CSV parser used by single-process ingestion
+    max_rows_per_second: Optional[float] = Field(None, gt=0)  # Optional throttle; unthrottled by default
+    max_bytes_per_second: Optional[float] = Field(None, gt=0)
+
+class JobPriorityUpdate(BaseModel):
+    priority: int  # Higher runs first; the default is 0
 
 class JobStatus(BaseModel):
     id: str
@@ -150,6 +263,12 @@ class JobStatus(BaseModel):
     error: Optional[str] = None
     duration: Optional[str] = None
     config: Optional[Dict[str, Any]] = None
+    metrics: Optional[Dict[str, Any]] = None
+    checkpoint: Optional[Dict[str, Any]] = None  # Last durable resume point of an unfinished job
+    queue_position: Optional[int] = None  # 1-based place in the ingestion queue while queued
+    queue_wait_seconds: Optional[float] = None  # Time waiting for a worker, so far or until dispatch
+    owner: Optional[str] = None
+    priority: int = 0
 
 # New models for ingestion history
 class IngestionHistoryItem(BaseModel):
@@ -192,113 +311,45 @@ class StatisticsResponse(BaseModel):
     error_rate: Optional[float] = None
 
 # Helper functions
-def detect_csv_schema(file_path, chunk_size=1000):
+def detect_csv_schema(file_path, chunk_size=1000, sampling="head"):
     """Detect schema from a CSV file"""
-    schema = {"name": Path(file_path).stem, "fields": []}
-    field_types = {}
-    sample_values = {}
-    
-    with open(file_path, 'r', newline='', encoding='utf-8') as csvfile:
-        # Read header
-        reader = csv.reader(csvfile)
-        headers = next(reader)
-        
-        # Initialize field types dictionary
-        for header in headers:
-            field_types[header] = set()
-            sample_values[header] = None
-        
-        # Process rows in chunks
-        row_count = 0
-        for row in reader:
-            if row_count >= chunk_size:
-                break
-                
-            for i, value in enumerate(row):
-                if i < len(headers):
-                    header = headers[i]
-                    
-                    # Store sample value if not already set
-                    if sample_values[header] is None and value:
-                        sample_values[header] = value
-                    
-                    # Detect type
-                    if not value:
-                        continue
-                    
-                    # Try to convert to different types
-                    try:
-                        int(value)
-                        field_types[header].add("integer")
-                        continue
-                    except ValueError:
-                        pass
-                    
-                    try:
-                        float(value)
-                        field_types[header].add("float")
-                        continue
-                    except ValueError:
-                        pass
-                    
-                    if value.lower() in ('true', 'false'):
-                        field_types[header].add("boolean")
-                        continue
-                    
-                    # Try date formats
-                    try:
-                        datetime.strptime(value, '%Y-%m-%d')
-                        field_types[header].add("date")
-                        continue
-                    except ValueError:
-                        pass
-                    
-                    try:
-                        datetime.strptime(value, '%Y-%m-%dT%H:%M:%S')
-                        field_types[header].add("datetime")
-                        continue
-                    except ValueError:
-                        pass
-                    
-                    # Default to string
-                    field_types[header].add("string")
-            
-            row_count += 1
-    
-    # Determine final type for each field
-    for header in headers:
-        types = field_types[header]
-        if "string" in types:
-            field_type = "string"
-        elif "datetime" in types:
-            field_type = "datetime"
-        elif "date" in types:
-            field_type = "date"
-        elif "boolean" in types:
-            field_type = "boolean"
-        elif "float" in types:
-            field_type = "float"
-        elif "integer" in types:
-            field_type = "integer"
-        else:
-            field_type = "string"  # Default
-        
-        schema["fields"].append({
-            "name": header,
-            "type": field_type,
-            "nullable": True,  # Assume nullable by default
-            "sample": sample_values[header]
-        })
-    
-    return schema
+    # Columns are classified with vectorized Arrow kernels, so large samples stay cheap
+    return infer_csv_schema(file_path, chunk_size, sampling)
 
-def detect_json_schema(file_path, chunk_size=1000):
-    """Detect schema from a JSON file"""
-    with open(file_path, 'r', encoding='utf-8') as jsonfile:
-        try:
-            data = json.load(jsonfile)
-        except json.JSONDecodeError:
-            raise ValueError("Invalid JSON file")
+def detect_json_schema(file_path, chunk_size=1000, sampling="head"):
+    """Detect schema from a JSON or JSON Lines file"""
+    ndjson = Path(file_path).suffix.lower() == ".jsonl"
+    
+    def head_records():
+        if ndjson:
+            # Newline-delimited records are read line by line, never loaded whole
+            with open(file_path, 'rb') as jsonfile:
+                return read_ndjson_values(jsonfile, 0, chunk_size)[0]
+        # Only the sampled records are decoded; the rest of the array is never read
+        return head_json_records(file_path, chunk_size)
+    
+    data = None
+    if sampling == "stratified":
+        # Stratified sampling seeks across the whole file instead of reading only its head
+        data = sample_ndjson_records(file_path, chunk_size) if ndjson else sample_json_records(file_path, chunk_size)
+    stratified = data is not None
+    
+    complete = False
+    if data is None or len(data) < chunk_size:
+        # A read from the start that ends before chunk_size records has seen the whole file
+        head = head_records()
+        if head is not None:
+            complete = len(head) < chunk_size
+            if data is None or complete:
+                data = head
+    
+    if data is None:
+        # A single top-level object is one record and has to be read whole
+        with open(file_path, 'r', encoding='utf-8') as jsonfile:
+            try:
+                data = json.load(jsonfile)
+            except json.JSONDecodeError:
+                raise ValueError("Invalid JSON file")
     
     schema = {"name": Path(file_path).stem, "fields": []}
     
@@ -313,122 +364,86 @@ def detect_json_schema(file_path, chunk_size=1000):
         # Use the first object to initialize field tracking
         first_obj = data[0]
         if not isinstance(first_obj, dict):
+            values = [value for value in data if not isinstance(value, dict)]
+            field_type = resolve_json_type(set(json_value_types(values)))
             schema["fields"].append({
                 "name": "value",
-                "type": get_json_type(first_obj),
-                "nullable": False,
-                "sample": first_obj
+                "type": field_type,
+                "nullable": any(value is None for value in values),
+                "sample": first_obj,
+                "confidence": type_confidence(field_type, sum(1 for value in values if value is not None), complete)
             })
             return schema
         
-        field_types = {key: set() for key in first_obj.keys()}
-        sample_values = {key: None for key in first_obj.keys()}
+        # Nested objects become dotted fields, matching the columns ingestion writes
+        records = [flatten_record(obj) for obj in data if isinstance(obj, dict)]
+        first_obj = records[0]
         
-        # Process each object
-        for obj in data:
-            if not isinstance(obj, dict):
-                continue
-                
+        # Keys can first appear anywhere in the file, so stratified samples track them all
+        keys = list(first_obj.keys())
+        if stratified:
+            for obj in records:
+                keys.extend(key for key in obj.keys() if key not in first_obj)
+            keys = list(dict.fromkeys(keys))
+        
+        # Gather each field's values so they can be typed in one batch
+        field_values = {key: [] for key in keys}
+        for obj in records:
             for key, value in obj.items():
-                if key in field_types:
-                    field_types[key].add(get_json_type(value))
-                    
-                    # Store sample value if not already set
-                    if sample_values[key] is None and value is not None:
-                        sample_values[key] = value
+                if key in field_values:
+                    field_values[key].append(value)
+        
+        # Keys whose objects were flattened into dotted children
+        parents = {key.rsplit(".", 1)[0] for key in keys if "." in key}
         
         # Create schema fields
-        for key in field_types:
-            types = field_types[key]
-            
-            # Determine the most specific type
-            if "object" in types:
-                field_type = "object"
-            elif "array" in types:
-                field_type = "array"
-            elif "string" in types:
-                field_type = "string"
-            elif "boolean" in types:
-                field_type = "boolean"
-            elif "float" in types:
-                field_type = "float"
-            elif "integer" in types:
-                field_type = "integer"
-            elif "null" in types:
-                field_type = "null"
-            else:
-                field_type = "string"  # Default
+        for key, values in field_values.items():
+            types = set(json_value_types(values))
+            if key in parents and types <= {"object", "null"}:
+                continue  # Only ever an empty object where its children are columns
             
+            field_type = resolve_json_type(types)
+            observed = [value for value in values if value is not None]
             schema["fields"].append({
                 "name": key,
                 "type": field_type,
-                "nullable": "null" in types,
-                "sample": sample_values[key]
+                "nullable": "null" in types or (stratified and len(values) < len(records)),
+                "sample": observed[0] if observed else None,
+                "confidence": type_confidence(field_type, len(observed), complete)
             })
     
     # Handle single object
     elif isinstance(data, dict):
-        for key, value in data.items():
+        flat = flatten_record(data)
+        for (key, value), field_type in zip(flat.items(), json_value_types(list(flat.values()))):
             schema["fields"].append({
                 "name": key,
-                "type": get_json_type(value),
+                "type": field_type,
                 "nullable": value is None,
-                "sample": value
+                "sample": value,
+                "confidence": 1.0  # The whole document was read
             })
     
     return schema
 
-def get_json_type(value):
-    """Determine the JSON type of a value"""
-    if value is None:
-        return "null"
-    elif isinstance(value, bool):
-        return "boolean"
-    elif isinstance(value, int):
-        return "integer"
-    elif isinstance(value, float):
-        return "float"
-    elif isinstance(value, str):
-        # Check if it might be a date
-        try:
-            datetime.strptime(value, '%Y-%m-%d')
-            return "date"
-        except ValueError:
-            pass
-        
-        try:
-            datetime.strptime(value, '%Y-%m-%dT%H:%M:%S')
-            return "datetime"
-        except ValueError:
-            pass
-        
-        return "string"
-    elif isinstance(value, list):
-        return "array"
-    elif isinstance(value, dict):
-        return "object"
-    else:
-        return "string"  # Default
-
 def get_db_schema(db_type, config, chunk_size=1000):
     """Get schema from a database table"""
-    connection_string = create_connection_string(db_type, config)
-    
     try:
-        engine = create_engine(connection_string)
-        inspector = inspect(engine)
-        
-        # Check if table exists
-        if config["table"] not in inspector.get_table_names():
-            raise ValueError(f"Table '{config['table']}' not found in database")
+        # Table listing and column reflection are served from the metadata cache
+        if config["table"] not in get_cached_table_names(db_type, config):
+            # The table may have been created since the listing was cached
+            invalidate_schema_cache(db_type, config, config["table"])
+            if config["table"] not in get_cached_table_names(db_type, config):
+                raise ValueError(f"Table '{config['table']}' not found in database")
         
         # Get table columns
-        columns = inspector.get_columns(config["table"])
+        columns = get_cached_columns(db_type, config, config["table"])
         
-        # Get sample data
-        with engine.connect() as connection:
-            result = connection.execute(f"SELECT * FROM {config['table']} LIMIT 1").fetchone()
-            sample_data = dict(result) if result else {}
+        # Get sample data without reflecting the table again
+        sample_table = sqlalchemy.table(config["table"], *[sqlalchemy.column(column["name"]) for column in columns])
+        with get_engine(db_type, config).connect() as connection:
+            result = connection.execute(select(sample_table).limit(1)).fetchone()
+            sample_data = dict(result._mapping) if result else {}
         
         schema = {
             "name": config["table"],
@@ -467,30 +482,32 @@ def get_db_schema(db_type, config, chunk_size=1000):
     except Exception as e:
         raise ValueError(f"Error connecting to database: {str(e)}")
 
-def create_connection_string(db_type, config):
-    """Create a database connection string"""
-    if db_type == "mysql":
-        return f"mysql+pymysql://{config['username']}:{config['password']}@{config['host']}:{config['port']}/{config['database']}"
-    elif db_type == "postgresql":
-        return f"postgresql://{config['username']}:{config['password']}@{config['host']}:{config['port']}/{config['database']}"
-    elif db_type == "mssql":
-        return f"mssql+pyodbc://{config['username']}:{config['password']}@{config['host']}:{config['port']}/{config['database']}?driver=ODBC+Driver+17+for+SQL+Server"
-    else:
-        raise ValueError(f"Unsupported database type: {db_type}")
-
 # Process file ingestion with database
-def process_file_ingestion_with_db(job_id, file_id, chunk_size, db):
-    """Process file ingestion in a background thread with database access"""
+def process_file_ingestion_with_db(job_id, file_id, chunk_size, db, workers=1, engine="pandas",
+                                   max_rows_per_second=None, max_bytes_per_second=None, resume=False):
+    """Process file ingestion in a background thread with database access.
+
+    With resume=True the job continues from its last checkpoint instead of starting over.
+    """
     try:
         # Get a new database session
         db_session = SessionLocal()
+        mark_job_active(job_id)
         
         # Update job status
         job = get_ingestion_job(db_session, job_id)
+        check_cancelled(job_id)
+        checkpoint = load_checkpoint(job) if resume else {}
         job.status = "running"
-        job.progress = 0
+        job.error = None
+        job.end_time = None
+        if not checkpoint:
+            job.progress = 0
         db_session.commit()
         
+        # Progress is kept in memory per batch and written to the job row only every few seconds
+        progress = ProgressTracker(job, db_session)
+        
         # Get file info
         file_info = get_uploaded_file(db_session, file_id)
         if not file_info:
@@ -502,88 +519,171 @@ def process_file_ingestion_with_db(job_id, file_id, chunk_size, db):
         # Create output file path
         output_file = DATA_DIR / f"{job_id}.parquet"
         
-        # Process file based on type
-        if file_type == "csv":
-            try:
-                # Read CSV in chunks with all columns as string type initially
-                chunk_iterator = pd.read_csv(
-                    file_path, 
-                    chunksize=chunk_size,
-                    dtype=str,  # Read all columns as strings initially
-                    keep_default_na=False  # Don't convert empty strings to NaN
-                )
-                
-                total_rows = sum(1 for _ in open(file_path, 'r')) - 1  # Subtract header row
-                processed_rows = 0
-                
-                # Process first chunk
-                first_chunk = next(chunk_iterator)
-                
-                # Try to convert numeric columns safely
-                for col in first_chunk.columns:
-                    # Try to convert to numeric, but keep as string if it fails
-                    if col in ['MonthlyCharges', 'TotalCharges']:
-                        first_chunk[col] = pd.to_numeric(first_chunk[col], errors='coerce')
-                
-                first_chunk.to_parquet(output_file, index=False)
-                processed_rows += len(first_chunk)
-                
-                # Update progress
-                job.progress = min(int((processed_rows / total_rows) * 100), 99)
-                db_session.commit()
-                
-                # Process remaining chunks
-                for chunk in chunk_iterator:
-                    # Try to convert numeric columns safely
-                    for col in chunk.columns:
-                        if col in ['MonthlyCharges', 'TotalCharges']:
-                            chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+        # Optional pacing requested for the job; a no-op when no limit is set
+        limiter = RateLimiter(max_rows_per_second, max_bytes_per_second)
+        
+        if checkpoint:
+            logger.info(f"Resuming job {job_id} after {checkpoint.get('rows', 0)} rows")
+        
+        # Committed parts of an interrupted run are kept; anything written after them is redone
+        with PartParquetWriter(output_file, checkpoint.get("parts", 0)) as writer:
+            # Process file based on type
+            if file_type == "csv":
+                try:
+                    # Progress comes from the reader's byte position, so the input is read exactly once
+                    file_size = max(os.path.getsize(file_path), 1)
+                    processed_rows = checkpoint.get("rows", 0)
                     
-                    # Read existing parquet file
-                    if os.path.exists(output_file):
-                        existing_df = pd.read_parquet(output_file)
-                        # Concatenate with new chunk
-                        combined_df = pd.concat([existing_df, chunk], ignore_index=True)
-                        # Write back to file
-                        combined_df.to_parquet(output_file, index=False)
-                    else:
-                        chunk.to_parquet(output_file, index=False)
-                        
-                    processed_rows += len(chunk)
+                    # Cast columns to the detected schema so numerics, booleans and dates land as native types
+                    schema_fields = get_file_schema_fields(db_session, file_info, chunk_size)
+                    coercion_errors = {}
                     
-                    # Update progress
-                    job.progress = min(int((processed_rows / total_rows) * 100), 99)
-                    db_session.commit()
+                    if workers > 1:
+                        progress_state = {"rows": 0, "bytes": checkpoint.get("offset", 0)}
+                        
+                        def report_progress(rows, bytes_done):
+                            limiter.consume(rows - progress_state["rows"], bytes_done - progress_state["bytes"])
+                            progress_state.update(rows=rows, bytes=bytes_done)
+                            progress.update(min(int((bytes_done / file_size) * 100), 99), processed_rows + rows)
+                            if writer.pending_rows >= CHECKPOINT_ROWS:
+                                # Ranges end on record boundaries, so the byte offset is an exact resume point
+                                save_checkpoint(job, writer, rows=processed_rows + rows, offset=bytes_done)
+                                progress.flush()
+                            check_cancelled(job_id)
+                        
+                        # Record-aligned byte ranges are parsed in worker processes and written back in file order
+                        rows, coercion_errors = ingest_csv_parallel(
+                            file_path, writer, schema_fields, workers, on_progress=report_progress,
+                            start_offset=checkpoint.get("offset")
+                        )
+                        processed_rows += rows
+                    else:
+                        # Append each chunk as a new row group instead of rewriting the whole file
+                        headers = read_csv_header(file_path)
+                        with open(file_path, 'rb') as csv_file:
+                            bytes_read = 0
+                            if engine == "arrow":
+                                # Multithreaded Arrow reader straight into record batches, with no DataFrame in between
+                                reader = open_csv_reader(csv_file, headers, skip_rows=processed_rows)
+                                chunk_iterator = (pa.Table.from_batches([batch]) for batch in reader)
+                            else:
+                                # Read CSV in chunks with all columns as string type initially
+                                chunk_iterator = (
+                                    pa.Table.from_pandas(chunk, preserve_index=False)
+                                    for chunk in pd.read_csv(
+                                        csv_file,
+                                        names=headers,  # Same column names as the schema and the other engines
+                                        header=0,
+                                        chunksize=chunk_size,
+                                        dtype=str,  # Read all columns as strings initially
+                                        keep_default_na=False,  # Don't convert empty strings to NaN
+                                        skiprows=range(1, processed_rows + 1)  # Rows committed before a resume
+                                    )
+                                )
+                            
+                            for chunk in chunk_iterator:
+                                table, errors = coerce_table(chunk, schema_fields)
+                                for column, count in errors.items():
+                                    coercion_errors[column] = coercion_errors.get(column, 0) + count
+                                
+                                writer.write_table(table)
+                                processed_rows += table.num_rows
+                                
+                                # Update progress (the parser reads ahead in blocks, so this is approximate)
+                                limiter.consume(table.num_rows, csv_file.tell() - bytes_read)
+                                bytes_read = csv_file.tell()
+                                progress.update(min(int((bytes_read / file_size) * 100), 99), processed_rows)
+                                if writer.pending_rows >= CHECKPOINT_ROWS:
+                                    # The reader's byte position runs ahead, so resume by row count
+                                    save_checkpoint(job, writer, rows=processed_rows)
+                                    progress.flush()
+                                check_cancelled(job_id)
+                            
+                            if writer.schema is None:
+                                # The Arrow reader yields no batches for a file with only a header
+                                writer.write_table(empty_csv_table(headers, schema_fields))
                     
-                    time.sleep(0.1)  # Simulate processing time
-            except Exception as e:
-                logger.error(f"Error processing CSV file: {str(e)}")
-                raise ValueError(f"Error processing CSV file: {str(e)}")
-        
-        elif file_type == "json":
-            # Read JSON
-            with open(file_path, 'r') as f:
-                data = json.load(f)
+                    if coercion_errors:
+                        logger.warning(f"Coercion errors for job {job_id}: {coercion_errors}")
+                    # Record the exact row count now that the single pass is done
+                    update_job_metrics(job, {
+                        "rows": processed_rows,
+                        "bytes": file_size,
+                        "coercion_errors": coercion_errors,
+                        **limiter.metrics()
+                    })
+                except JobCancelled:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error processing CSV file: {str(e)}")
+                    raise ValueError(f"Error processing CSV file: {str(e)}")
             
-            # Convert to DataFrame
-            if isinstance(data, list):
-                df = pd.DataFrame(data)
-            else:
-                df = pd.DataFrame([data])
-            
-            # Save to parquet
-            df.to_parquet(output_file, index=False)
+            elif file_type in ("json", "jsonl"):
+                # Records are decoded incrementally, so memory is bounded by chunk_size rather than the file
+                file_size = max(os.path.getsize(file_path), 1)
+                processed_rows = checkpoint.get("rows", 0)
+                bytes_read = checkpoint.get("offset", 0)
+                
+                # The detected schema fixes the columns and types of every batch
+                schema_fields = get_file_schema_fields(db_session, file_info, chunk_size)
+                coercion_errors = {}
+                added_fields = []
+                
+                with open(file_path, 'rb') as json_file:
+                    batches = iter_json_batches(
+                        json_file, chunk_size, ndjson=file_type == "jsonl", offset=checkpoint.get("offset")
+                    )
+                    for records, offset in batches:
+                        # Keys the schema sample never saw get new columns instead of being dropped
+                        new_fields = unseen_fields(records, schema_fields)
+                        if new_fields:
+                            names = [field["name"] for field in new_fields]
+                            logger.warning(f"Adding fields missing from the schema of file {file_id}: {names}")
+                            schema_fields = schema_fields + new_fields
+                            added_fields.extend(names)
+                            # A resumed job and later previews start from the widened schema
+                            stored_schema = json.loads(file_info.schema) if file_info.schema else {}
+                            save_uploaded_file(db_session, file_id, {"schema": {**stored_schema, "fields": schema_fields}})
+                        
+                        table, errors = records_to_table(records, schema_fields)
+                        for column, count in errors.items():
+                            coercion_errors[column] = coercion_errors.get(column, 0) + count
+                        
+                        writer.write_table(table)
+                        processed_rows += table.num_rows
+                        
+                        # Progress from bytes consumed by the decoder
+                        limiter.consume(table.num_rows, offset - bytes_read)
+                        bytes_read = offset
+                        progress.update(min(int((bytes_read / file_size) * 100), 99), processed_rows)
+                        if writer.pending_rows >= CHECKPOINT_ROWS:
+                            save_checkpoint(job, writer, rows=processed_rows, offset=offset)
+                            progress.flush()
+                        check_cancelled(job_id)
+                    
+                    if not processed_rows:
+                        # Still produce a readable file with the detected columns
+                        writer.write_table(records_to_table([], schema_fields)[0])
+                
+                if coercion_errors:
+                    logger.warning(f"Type mismatches for job {job_id}: {coercion_errors}")
+                update_job_metrics(job, {
+                    "rows": processed_rows,
+                    "bytes": file_size,
+                    "coercion_errors": coercion_errors,
+                    "added_fields": added_fields,
+                    **limiter.metrics()
+                })
             
-            # Update progress
-            for progress in range(0, 100, 10):
-                job.progress = progress
-                db_session.commit()
-                time.sleep(0.2)  # Simulate processing time
+            # Merge the committed parts into the job's output file; a job cancelled by now never completes
+            check_cancelled(job_id)
+            writer.finish()
         
         # Mark job as completed
         job.status = "completed"
         job.progress = 100
         job.end_time = datetime.now()
+        job.checkpoint = None
         
         # Calculate duration
         start_time = job.start_time
@@ -593,13 +693,25 @@ def process_file_ingestion_with_db(job_id, file_id, chunk_size, db):
         
         db_session.commit()
         
+        # The parts were kept for a resume until the completion above was committed
+        writer.remove_parts()
+        
         logger.info(f"File ingestion completed for job {job_id}")
     
+    except JobCancelled:
+        # The worker is the only writer of a cancelled job's status, so completion can never overwrite it
+        try:
+            db_session.rollback()
+            record_job_cancelled(db_session, job_id)
+        except Exception as e:
+            logger.error(f"Error recording cancellation of job {job_id}: {str(e)}")
+    
     except Exception as e:
         logger.error(f"Error processing file ingestion: {str(e)}")
         
-        # Update job status to failed
+        # Update job status to failed; the checkpoint is kept so the job can be resumed
         try:
+            db_session.rollback()
             job = get_ingestion_job(db_session, job_id)
             job.status = "failed"
             job.error = str(e)
@@ -610,105 +722,282 @@ def process_file_ingestion_with_db(job_id, file_id, chunk_size, db):
     
     finally:
         # Close the database session
+        mark_job_inactive(job_id)
         db_session.close()
 
 # Process database ingestion with database
-def process_db_ingestion_with_db(job_id, db_type, db_config, chunk_size, db):
-    """Process database ingestion in a background thread with database access"""
+def process_db_ingestion_with_db(job_id, db_type, db_config, chunk_size, db, resume=False):
+    """Process database ingestion in a background thread with database access.
+
+    With resume=True the job continues from its last checkpoint instead of starting over.
+    """
     try:
         # Get a new database session
         db_session = SessionLocal()
+        mark_job_active(job_id)
         
         # Update job status
         job = get_ingestion_job(db_session, job_id)
+        check_cancelled(job_id)
+        checkpoint = load_checkpoint(job) if resume else {}
+        extraction_mode = db_config.get('extraction_mode', 'auto')
+        if extraction_mode == 'stream' and checkpoint:
+            # A server-side cursor has no stable order to seek back into
+            logger.info(f"Streaming job {job_id} cannot resume mid-table; restarting it")
+            checkpoint = {}
         job.status = "running"
-        job.progress = 0
+        job.error = None
+        job.end_time = None
+        if not checkpoint:
+            job.progress = 0
         db_session.commit()
         
-        # Create connection string
-        connection_string = create_connection_string(db_type, db_config)
+        # Progress is kept in memory per batch and written to the job row only every few seconds
+        progress = ProgressTracker(job, db_session)
         
         # Create output file path
         output_file = DATA_DIR / f"{job_id}.parquet"
         
-        # Connect to database
-        engine = create_engine(connection_string)
+        # Range-partitioned extraction needs one pooled connection per worker plus the planning connection;
+        # requests are validated against the same limit, but stored jobs may predate a lower one
+        parallel_workers = min(max(int(db_config.get('parallel_workers') or 1), 1), MAX_PARALLEL_WORKERS)
         
-        try:
-            # Get total row count
-            with engine.connect() as conn:
-                result = conn.execute(f"SELECT COUNT(*) FROM {db_config['table']}")
-                total_rows = result.scalar()
+        # Jobs run in scheduler worker processes, which keep their own engine registry: the pool is
+        # reused by later jobs on the same worker, never by the API's schema lookups
+        engine = get_engine(db_type, db_config, pool_size=parallel_workers + 1)
+        
+        # Optional pacing to protect the source database; unthrottled by default
+        limiter = RateLimiter(db_config.get('max_rows_per_second'), db_config.get('max_bytes_per_second'))
+        
+        # Read data in chunks
+        processed_rows = checkpoint.get("rows", 0)
+        
+        # Write each fetched page into the checkpointed part writer
+        with engine.connect() as conn, PartParquetWriter(output_file, checkpoint.get("parts", 0)) as writer:
+            table = reflect_table(conn, db_config['table'])
+            # Output types follow the source columns rather than whatever the first page holds
+            column_types = arrow_column_types(table)
             
-            # Read data in chunks
-            offset = 0
-            processed_rows = 0
+            # Estimate the total from catalog statistics rather than a full COUNT(*) scan
+            total_rows = max(estimate_row_count(conn, table), 1)
             
-            while offset < total_rows:
-                # Update progress
-                job.progress = min(int((processed_rows / total_rows) * 100), 99)
-                db_session.commit()
-                
-                # Read chunk
-                query = f"SELECT * FROM {db_config['table']} LIMIT {chunk_size} OFFSET {offset}"
-                chunk = pd.read_sql(query, engine)
+            key_columns = None
+            if extraction_mode not in ('stream', 'offset'):
+                key_columns = discover_key_columns(conn, db_config['table'], db_config.get('key_column'))
+            
+            # Input position matching everything written so far, saved with each checkpoint
+            position = {}
+            
+            def save_batch(chunk, range_index=None):
+                nonlocal processed_rows
                 
                 # Save chunk
-                if offset == 0:
-                    chunk.to_parquet(output_file, index=False)
-                else:
-                    # Read existing parquet file
-                    if os.path.exists(output_file):
-                        existing_df = pd.read_parquet(output_file)
-                        # Concatenate with new chunk
-                        combined_df = pd.concat([existing_df, chunk], ignore_index=True)
-                        # Write back to file
-                        combined_df.to_parquet(output_file, index=False)
-                    else:
-                        chunk.to_parquet(output_file, index=False)
+                writer.write_table(batch_to_table(chunk, column_types))
                 
                 # Update counters
                 processed_rows += len(chunk)
-                offset += chunk_size
+                if key_columns and extraction_mode != 'stream':
+                    last_values = encode_key_values(last_key_values(chunk, key_columns))
+                    if range_index is None:
+                        position["last_values"] = last_values
+                    else:
+                        position["range_last_values"][range_index] = last_values
                 
-                # Simulate processing time
-                time.sleep(0.2)
-            
-            # Mark job as completed
-            job.status = "completed"
-            job.progress = 100
-            job.end_time = datetime.now()
+                # Update progress
+                progress.update(min(int((processed_rows / total_rows) * 100), 99), processed_rows)
+                if writer.pending_rows >= CHECKPOINT_ROWS:
+                    save_checkpoint(job, writer, rows=processed_rows, **position)
+                    progress.flush()
+                check_cancelled(job_id)
+                
+                # In-memory size stands in for bytes read; it is only measured when a byte limit is set
+                nbytes = 0
+                if limiter.bytes_per_second:
+                    nbytes = chunk.nbytes if isinstance(chunk, pa.Table) else int(chunk.memory_usage(deep=True).sum())
+                limiter.consume(len(chunk), nbytes)
             
-            # Calculate duration
-            start_time = job.start_time
-            end_time = job.end_time
-            duration = end_time - start_time
-            job.duration = str(duration)
+            if checkpoint:
+                logger.info(f"Resuming job {job_id} after {processed_rows} rows")
             
-            db_session.commit()
+            if extraction_mode == 'stream':
+                # One server-side cursor for the whole table, fetched in chunk_size batches
+                logger.info(f"Using server-side cursor streaming for job {job_id}")
+                for chunk in iter_streaming_batches(conn, table, chunk_size):
+                    save_batch(chunk)
+            elif key_columns and parallel_workers > 1:
+                # Split the table into key ranges and extract them concurrently, one row group per batch
+                partition_column = db_config.get('partition_column') or key_columns[0]
+                if "ranges" in checkpoint:
+                    # Keep the original plan so each range resumes after its own last key
+                    ranges = [
+                        tuple(decode_key_values(table, [partition_column] * 2, bounds))
+                        for bounds in checkpoint["ranges"]
+                    ]
+                    range_last_values = checkpoint["range_last_values"]
+                else:
+                    ranges = plan_key_ranges(conn, table, partition_column, parallel_workers)
+                    range_last_values = [None] * len(ranges)
+                position["ranges"] = [encode_key_values(bounds) for bounds in ranges]
+                position["range_last_values"] = list(range_last_values)
+                logger.info(f"Extracting {len(ranges)} ranges of {partition_column} with {parallel_workers} workers for job {job_id}")
+                extract_ranges_parallel(
+                    engine, table, key_columns, partition_column, ranges, chunk_size, save_batch, parallel_workers,
+                    last_values=[
+                        decode_key_values(table, key_columns, values) if values else None
+                        for values in range_last_values
+                    ]
+                )
+            elif key_columns:
+                # Seek on the primary key (or a chosen ordered column) instead of rescanning skipped rows
+                logger.info(f"Using keyset pagination on {key_columns} for job {job_id}")
+                last_values = checkpoint.get("last_values")
+                if last_values:
+                    last_values = decode_key_values(table, key_columns, last_values)
+                for chunk in iter_keyset_batches(conn, table, key_columns, chunk_size, last_values):
+                    save_batch(chunk)
+            else:
+                if extraction_mode != 'offset':
+                    logger.warning(f"No key found for table {db_config['table']}, falling back to LIMIT/OFFSET")
+                for chunk in iter_offset_batches(conn, table, chunk_size, offset=processed_rows):
+                    save_batch(chunk)
             
-            logger.info(f"Database ingestion completed for job {job_id}")
+            # Merge the committed parts into the job's output file; a job cancelled by now never completes
+            check_cancelled(job_id)
+            writer.finish()
         
-        finally:
-            engine.dispose()
+        update_job_metrics(job, {"rows": processed_rows, **limiter.metrics()})
+        
+        # Mark job as completed; the stored connection is no longer needed
+        job.status = "completed"
+        job.progress = 100
+        job.end_time = datetime.now()
+        job.checkpoint = None
+        job.source_config = None
+        
+        # Calculate duration
+        start_time = job.start_time
+        end_time = job.end_time
+        duration = end_time - start_time
+        job.duration = str(duration)
+        
+        db_session.commit()
+        
+        # The parts were kept for a resume until the completion above was committed
+        writer.remove_parts()
+        
+        logger.info(f"Database ingestion completed for job {job_id}")
+    
+    except JobCancelled:
+        # The worker is the only writer of a cancelled job's status, so completion can never overwrite it
+        try:
+            db_session.rollback()
+            record_job_cancelled(db_session, job_id)
+        except Exception as e:
+            logger.error(f"Error recording cancellation of job {job_id}: {str(e)}")
     
     except Exception as e:
         logger.error(f"Error processing database ingestion: {str(e)}")
         
-        # Update job status to failed
+        # Update job status to failed; the checkpoint is kept so the job can be resumed
         try:
+            db_session.rollback()
             job = get_ingestion_job(db_session, job_id)
             job.status = "failed"
             job.error = str(e)
             job.end_time = datetime.now()
+            if not job.checkpoint:
+                # Nothing to resume from, so the connection details are no longer needed
+                job.source_config = None
             db_session.commit()
         except:
             pass
     
     finally:
         # Close the database session
+        mark_job_inactive(job_id)
         db_session.close()
 
+def run_ingestion_job(job_id):
+    """Run a claimed ingestion job in a scheduler worker process, continuing from its checkpoint if any"""
+    # Cancellations are requested from the API process, so pick them up from the job rows
+    watch_cancellations()
+    
+    db_session = SessionLocal()
+    try:
+        job = get_ingestion_job(db_session, job_id)
+        config = json.loads(job.config) if job.config else {}
+        source = json.loads(job.source_config) if job.source_config else None
+        mark_job_active(job_id)
+        if job.cancel_requested_at:
+            request_cancel(job_id, job.cancel_requested_at)
+        if job.type != "file" and source is None:
+            raise ValueError("Connection details for this job are no longer stored; start a new ingestion")
+    except Exception as e:
+        logger.error(f"Error starting ingestion job {job_id}: {str(e)}")
+        mark_job_inactive(job_id)
+        job = get_ingestion_job(db_session, job_id)
+        if job:
+            job.status = "failed"
+            job.error = str(e)
+            job.end_time = datetime.now()
+            if not job.checkpoint:
+                job.source_config = None
+            db_session.commit()
+        return
+    finally:
+        db_session.close()
+    
+    if job.type == "file":
+        process_file_ingestion_with_db(
+            job_id, config["file_id"], config.get("chunk_size", 1000), None,
+            workers=config.get("workers", 1),
+            engine=config.get("engine", "pandas"),
+            max_rows_per_second=config.get("max_rows_per_second"),
+            max_bytes_per_second=config.get("max_bytes_per_second"),
+            resume=True
+        )
+    else:
+        process_db_ingestion_with_db(
+            job_id, source["type"], open_source_config(source["config"]), source["chunk_size"], None, resume=True
+        )
+
+# Dispatches queued jobs to worker processes; started with the application unless only worker nodes should
+scheduler = IngestionScheduler(run_ingestion_job)
+
+def load_job_events(job_ids):
+    """Current state of ingestion jobs as pushed to /job-events watchers, keyed by job id"""
+    db = SessionLocal()
+    try:
+        jobs = db.query(IngestionJob).filter(IngestionJob.id.in_(job_ids)).all()
+        positions = {}
+        if any(job.status == "queued" for job in jobs):
+            # One ordering pass serves every watched queued job
+            ordered = order_queue(queued_jobs(db).all(), running_counts(db))
+            positions = {job.id: position for position, job in enumerate(ordered, start=1)}
+        
+        snapshots = {}
+        for job in jobs:
+            progress = job.progress or 0
+            live_progress = get_live_progress(job.id)
+            if live_progress is not None and job.status == "running":
+                progress = max(live_progress, progress)
+            metrics = json.loads(job.metrics) if job.metrics else {}
+            snapshots[job.id] = {
+                "status": job.status,
+                "progress": progress,
+                "rows": metrics.get("rows", load_checkpoint(job).get("rows")),
+                "error": job.error,
+                "end_time": job.end_time.isoformat() if job.end_time else None,
+                "duration": job.duration,
+                "queue_position": positions.get(job.id)
+            }
+        return snapshots
+    finally:
+        db.close()
+
+# Watchers of the same job share one read of its row, however many streams are open
+job_event_bus.loader = load_job_events
+
 # API Routes
 @router.post("/upload", status_code=status.HTTP_200_OK)
 async def upload_file(
@@ -720,10 +1009,10 @@ async def upload_file(
     """Upload a file for data ingestion"""
     # Validate file type
     file_ext = file.filename.split('.')[-1].lower()
-    if file_ext not in ['csv', 'json']:
+    if file_ext not in ['csv', 'json', 'jsonl']:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Only CSV and JSON files are supported"
+            detail="Only CSV, JSON and JSON Lines (.jsonl) files are supported"
         )
     
     # Generate a unique file ID
@@ -766,6 +1055,8 @@ async def upload_file(
 @router.get("/schema/{file_id}", status_code=status.HTTP_200_OK)
 async def get_file_schema(
     file_id: str,
+    sample_size: Optional[int] = Query(None, ge=1),
+    sampling: str = Query("head", pattern="^(head|stratified)$"),
     current_user: User = Depends(has_permission("schema:read")),
     db: Session = Depends(get_db)
 ):
@@ -778,13 +1069,13 @@ async def get_file_schema(
         )
     
     file_path = file_info.path
-    chunk_size = file_info.chunk_size
+    chunk_size = sample_size or file_info.chunk_size
     
     try:
         if file_info.type == "csv":
-            schema = detect_csv_schema(file_path, chunk_size)
-        elif file_info.type == "json":
-            schema = detect_json_schema(file_path, chunk_size)
+            schema = detect_csv_schema(file_path, chunk_size, sampling)
+        elif file_info.type in ("json", "jsonl"):
+            schema = detect_json_schema(file_path, chunk_size, sampling)
         else:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -824,7 +1115,7 @@ async def test_database_connection(
         config = connection_info.get("config", {})
         
         # Validate required fields
-        required_fields = ["host", "port", "database", "username"]
+        required_fields = get_required_db_fields(db_type, include_table=False)
         for field in required_fields:
             if not config.get(field):
                 raise HTTPException(
@@ -832,11 +1123,9 @@ async def test_database_connection(
                     detail=f"Missing required field: {field}"
                 )
         
-        # Create connection string
-        connection_string = create_connection_string(db_type, config)
-        
-        # Test connection
-        engine = create_engine(connection_string)
+        # Test connection (the pooled engine stays warm for the schema lookups that follow;
+        # ingestion jobs run in scheduler worker processes with engines of their own)
+        engine = get_engine(db_type, config)
         with engine.connect() as connection:
             # Just test the connection
             pass
@@ -869,7 +1158,7 @@ async def get_database_schema(
         chunk_size = connection_info.get("chunkSize", 1000)
         
         # Validate required fields
-        required_fields = ["host", "port", "database", "username", "table"]
+        required_fields = get_required_db_fields(db_type)
         for field in required_fields:
             if not config.get(field):
                 raise HTTPException(
@@ -877,6 +1166,10 @@ async def get_database_schema(
                     detail=f"Missing required field: {field}"
                 )
         
+        # Drop cached metadata when the client asks for a fresh reflection
+        if connection_info.get("refresh"):
+            invalidate_schema_cache(db_type, config, config["table"])
+        
         # Get schema
         schema = get_db_schema(db_type, config, chunk_size)
         
@@ -898,7 +1191,6 @@ async def get_database_schema(
 @router.post("/ingest-file", status_code=status.HTTP_200_OK)
 async def ingest_file(
     request: FileIngestionRequest,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(has_permission("ingestion:create")),
     db: Session = Depends(get_db)
 ):
@@ -907,6 +1199,8 @@ async def ingest_file(
         file_id = request.file_id
         file_name = request.file_name
         chunk_size = request.chunk_size
+        workers = request.workers
+        engine = request.engine
         
         # Check if file exists
         file_info = get_uploaded_file(db, file_id)
@@ -919,27 +1213,34 @@ async def ingest_file(
         # Generate job ID
         job_id = str(uuid.uuid4())
         
-        # Create job in database
+        # Create job in database; the scheduler picks it up from the queue
+        now = datetime.now().isoformat()
         job_data = {
             "id": job_id,
             "name": file_name,
             "type": "file",
             "status": "queued",
             "progress": 0,
-            "start_time": datetime.now().isoformat(),
+            "start_time": now,
+            "queued_at": now,
+            "owner": current_user.username,
+            "owner_role": current_user.role,
+            "priority": 0,
             "end_time": None,
             "details": f"File: {file_name}",
             "error": None,
             "duration": None,
             "config": {
                 "file_id": file_id,
-                "chunk_size": chunk_size
+                "chunk_size": chunk_size,
+                "workers": workers,
+                "engine": engine,
+                "max_rows_per_second": request.max_rows_per_second,
+                "max_bytes_per_second": request.max_bytes_per_second
             }
         }
         save_ingestion_job(db, job_id, job_data)
-        
-        # Start background task with database session
-        background_tasks.add_task(process_file_ingestion_with_db, job_id, file_id, chunk_size, db)
+        scheduler.wake()
         
         # Log activity
         log_activity(
@@ -949,47 +1250,88 @@ async def ingest_file(
             details=f"Started ingestion for file: {file_name}"
         )
         
-        return {"job_id": job_id, "message": "File ingestion started"}
+        return {"job_id": job_id, "message": "File ingestion queued"}
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error starting ingestion: {str(e)}"
         )
 
+def extraction_option_error(name, value, message):
+    """A 422 for one setting of a database config, shaped like FastAPI's request body errors"""
+    return RequestValidationError([
+        {"type": "value_error", "loc": ("body", "config", name), "msg": message, "input": value}
+    ])
+
+def validate_extraction_options(config):
+    """Parse the extraction settings of a database config, answering 422 like a request body error"""
+    try:
+        options = DatabaseExtractionOptions(**config)
+    except ValidationError as e:
+        raise RequestValidationError([
+            {**error, "loc": ("body", "config", *error["loc"])} for error in e.errors()
+        ])
+    if options.partition_column and (options.parallel_workers == 1 or options.extraction_mode != "auto"):
+        # Only parallel keyset extraction splits the table into ranges; any other run would ignore it
+        raise extraction_option_error(
+            "partition_column", options.partition_column,
+            "partition_column needs parallel_workers above 1 and extraction_mode 'auto'"
+        )
+    return options
+
+def check_partition_column(db_type, config, column):
+    """Reject a partition column the source table lacks or that cannot be split into ranges"""
+    columns = {info["name"]: info for info in get_cached_columns(db_type, config, config["table"])}
+    if column not in columns:
+        raise extraction_option_error("partition_column", column, f"Column '{column}' not found in table '{config['table']}'")
+    if not can_partition(columns[column]["type"]):
+        raise extraction_option_error("partition_column", column, "partition_column must be an integer or datetime column")
+
 @router.post("/ingest-db", status_code=status.HTTP_200_OK)
 async def ingest_database(
     request: DatabaseConfig,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(has_permission("ingestion:create")),
     db: Session = Depends(get_db)
 ):
     """Start database ingestion job"""
+    # Extraction settings size thread and connection pools, so bad values are rejected before queueing
+    options = validate_extraction_options(request.config)
     try:
         db_type = request.type
-        db_config = request.config
+        db_config = {**request.config, **options.model_dump(exclude_unset=True)}
         chunk_size = request.chunk_size
         connection_name = request.connection_name
         
         # Validate required fields
-        required_fields = ["host", "port", "database", "username", "table"]
+        required_fields = get_required_db_fields(db_type)
         for field in required_fields:
             if not db_config.get(field):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Missing required field: {field}"
                 )
+        # Reject unsupported types and disallowed SQLite paths before the job is queued
+        create_connection_string(db_type, db_config)
+        if options.partition_column:
+            # Reflected columns are usually cached from the schema lookup that came before
+            check_partition_column(db_type, db_config, options.partition_column)
         
         # Generate job ID
         job_id = str(uuid.uuid4())
         
-        # Create job in database
+        # Create job in database; the scheduler picks it up from the queue
+        now = datetime.now().isoformat()
         job_data = {
             "id": job_id,
             "name": connection_name,
             "type": "database",
             "status": "queued",
             "progress": 0,
-            "start_time": datetime.now().isoformat(),
+            "start_time": now,
+            "queued_at": now,
+            "owner": current_user.username,
+            "owner_role": current_user.role,
+            "priority": 0,
             "end_time": None,
             "details": f"DB: {db_config['database']}.{db_config['table']}",
             "error": None,
@@ -997,13 +1339,18 @@ async def ingest_database(
             "config": {
                 "type": db_type,
                 "database": db_config["database"],
-                "table": db_config["table"]
-            }
+                "table": db_config["table"],
+                "key_column": db_config.get("key_column"),
+                "extraction_mode": db_config.get("extraction_mode", "auto"),
+                "parallel_workers": db_config.get("parallel_workers", 1),
+                "max_rows_per_second": db_config.get("max_rows_per_second"),
+                "max_bytes_per_second": db_config.get("max_bytes_per_second")
+            },
+            # Connection details with the password encrypted, kept only while the job can be resumed
+            "source_config": {"type": db_type, "config": seal_source_config(db_config), "chunk_size": chunk_size}
         }
         save_ingestion_job(db, job_id, job_data)
-        
-        # Start background task with database session
-        background_tasks.add_task(process_db_ingestion_with_db, job_id, db_type, db_config, chunk_size, db)
+        scheduler.wake()
         
         # Log activity
         log_activity(
@@ -1013,7 +1360,9 @@ async def ingest_database(
             details=f"Started ingestion for table: {db_config['database']}.{db_config['table']}"
         )
         
-        return {"job_id": job_id, "message": "Database ingestion started"}
+        return {"job_id": job_id, "message": "Database ingestion queued"}
+    except RequestValidationError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1034,6 +1383,12 @@ async def get_job_status(
             detail="Job not found"
         )
     
+    # A job dispatched from this process reports progress live; the row is only updated every few seconds
+    progress = job.progress
+    live_progress = get_live_progress(job_id)
+    if live_progress is not None and job.status == "running":
+        progress = max(live_progress, progress or 0)
+    
     # Convert database model to response model
     config = json.loads(job.config) if job.config else None
     
@@ -1042,13 +1397,72 @@ async def get_job_status(
         name=job.name,
         type=job.type,
         status=job.status,
-        progress=job.progress,
+        progress=progress,
         start_time=job.start_time.isoformat(),
         end_time=job.end_time.isoformat() if job.end_time else None,
         details=job.details,
         error=job.error,
         duration=job.duration,
-        config=config
+        config=config,
+        metrics=json.loads(job.metrics) if job.metrics else None,
+        checkpoint=load_checkpoint(job) or None,
+        queue_position=queue_position(db, job),
+        queue_wait_seconds=queue_wait_seconds(job),
+        owner=job.owner,
+        priority=job.priority or 0
+    )
+
+@router.get("/job-events")
+async def stream_job_events(
+    request: Request,
+    job_ids: str = Query(..., description="Comma-separated ids of the jobs to watch"),
+    current_user: User = Depends(has_permission("ingestion:read")),
+    db: Session = Depends(get_db)
+):
+    """Stream progress, row counts and status changes of ingestion jobs as Server-Sent Events"""
+    watched = list(dict.fromkeys(job_id.strip() for job_id in job_ids.split(",") if job_id.strip()))
+    if not watched or len(watched) > MAX_WATCHED_JOBS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Watch between 1 and {MAX_WATCHED_JOBS} jobs"
+        )
+
+    found = {job_id for (job_id,) in db.query(IngestionJob.id).filter(IngestionJob.id.in_(watched))}
+    missing = [job_id for job_id in watched if job_id not in found]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job not found: {', '.join(missing)}"
+        )
+    # The stream can stay open for the whole job, so do not hold a pooled connection for it
+    db.close()
+
+    # Every watcher starts from the current state of its jobs
+    subscription = job_event_bus.subscribe(watched)
+
+    async def events():
+        finished = set()
+        try:
+            while len(finished) < len(watched):
+                snapshots = await subscription.get(timeout=JOB_EVENTS_KEEPALIVE_SECONDS)
+                if await request.is_disconnected():
+                    return
+                if not snapshots:
+                    # Keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                for snapshot in snapshots:
+                    if snapshot.get("status") in ("completed", "failed"):
+                        finished.add(snapshot["id"])
+                    yield f"event: job\ndata: {json.dumps(snapshot)}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 @router.post("/cancel-job/{job_id}", status_code=status.HTTP_200_OK)
@@ -1072,18 +1486,26 @@ async def cancel_job(
             detail=f"Cannot cancel job with status: {job.status}"
         )
     
-    # Update job status
-    job.status = "failed"
-    job.error = "Job cancelled by user"
-    job.end_time = datetime.now()
-    
-    # Calculate duration
-    start_time = job.start_time
-    end_time = job.end_time
-    duration = end_time - start_time
-    job.duration = str(duration)
-    
-    db.commit()
+    # A job still waiting in the queue is taken out of it before any worker can claim it
+    dequeued = db.query(IngestionJob).filter(IngestionJob.id == job_id, IngestionJob.status == "queued").update(
+        {"status": "failed"}, synchronize_session=False
+    )
+    if dequeued:
+        record_job_cancelled(db, job_id)
+    else:
+        # The worker process stops at its next batch, cleans up and records the cancellation itself
+        job.cancel_requested_at = datetime.now()
+        db.commit()
+        waited = 0.0
+        while waited < CANCEL_WAIT_SECONDS:
+            await asyncio.sleep(0.1)
+            waited += 0.1
+            db.expire_all()
+            if get_ingestion_job(db, job_id).status != "running":
+                break
+    db.expire_all()
+    job = get_ingestion_job(db, job_id)
+    job_event_bus.refresh([job_id])
     
     # Log activity
     log_activity(
@@ -1107,9 +1529,124 @@ async def cancel_job(
         details=job.details,
         error=job.error,
         duration=job.duration,
-        config=config
+        config=config,
+        metrics=json.loads(job.metrics) if job.metrics else None,
+        checkpoint=load_checkpoint(job) or None,
+        queue_position=queue_position(db, job),
+        queue_wait_seconds=queue_wait_seconds(job),
+        owner=job.owner,
+        priority=job.priority or 0
     )
 
+@router.post("/resume-job/{job_id}", status_code=status.HTTP_200_OK)
+async def resume_job(
+    job_id: str,
+    current_user: User = Depends(has_permission("ingestion:create")),
+    db: Session = Depends(get_db)
+):
+    """Resume an interrupted or failed ingestion job from its last checkpoint"""
+    job = get_ingestion_job(db, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    # Completed jobs have nothing left to do, and a queued or running job must not run twice
+    if job.status in ["completed", "queued", "running"] or is_job_active(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot resume job with status: {job.status}"
+        )
+    if job.type != "file" and not job.source_config:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Connection details for this job are no longer stored; start a new ingestion"
+        )
+    
+    # Back into the queue; the worker continues from the checkpoint
+    checkpoint = load_checkpoint(job)
+    job.status = "queued"
+    job.error = None
+    job.end_time = None
+    job.queued_at = datetime.now()
+    job.dispatched_at = None
+    job.cancel_requested_at = None
+    db.commit()
+    scheduler.wake()
+    job_event_bus.refresh([job_id])
+    
+    # Log activity
+    log_activity(
+        db=db,
+        username=current_user.username,
+        action="Job resumed",
+        details=f"Resumed ingestion job: {job.name} after {checkpoint.get('rows', 0)} rows"
+    )
+    
+    return {"job_id": job_id, "message": "Job queued for resume", "resumed_from_rows": checkpoint.get("rows", 0)}
+
+@router.put("/job-priority/{job_id}", status_code=status.HTTP_200_OK)
+async def set_job_priority(
+    job_id: str,
+    request: JobPriorityUpdate,
+    current_user: User = Depends(has_role("admin")),
+    db: Session = Depends(get_db)
+):
+    """Change the scheduling priority of a queued job, or of a failed one before it is resumed (admin only)"""
+    job = get_ingestion_job(db, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    # Priority only matters to jobs that will still wait for a worker
+    if job.status not in ["queued", "failed"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot change priority of job with status: {job.status}"
+        )
+    
+    previous = job.priority or 0
+    job.priority = request.priority
+    db.commit()
+    scheduler.wake()
+    job_event_bus.refresh([job_id])
+    
+    # Log activity
+    log_activity(
+        db=db,
+        username=current_user.username,
+        action="Job priority changed",
+        details=f"Changed priority of ingestion job {job.name} from {previous} to {request.priority}"
+    )
+    
+    return {"job_id": job_id, "priority": job.priority, "queue_position": queue_position(db, job)}
+
+@router.get("/ingestion-queue", status_code=status.HTTP_200_OK)
+async def get_ingestion_queue(
+    current_user: User = Depends(has_role("admin")),
+    db: Session = Depends(get_db)
+):
+    """Show queued jobs in dispatch order and per-user queue depth (admin only)"""
+    ordered = order_queue(queued_jobs(db).all(), running_counts(db))
+    return {
+        "users": queue_depth_by_user(db),
+        "jobs": [
+            {
+                "id": job.id,
+                "name": job.name,
+                "type": job.type,
+                "owner": job.owner,
+                "priority": job.priority or 0,
+                "queue_position": position,
+                "queue_wait_seconds": queue_wait_seconds(job)
+            }
+            for position, job in enumerate(ordered, start=1)
+        ]
+    }
+
 @router.get("/ingestion-history", response_model=IngestionHistoryResponse)
 async def get_ingestion_history(
     page: int = Query(1, ge=1),
@@ -1285,7 +1822,7 @@ async def get_ingestion_preview(
                         "filename": file_info.filename if file_info else f"file_{file_id}",
                         "type": "csv"
                     }
-                elif file_type == "json":
+                elif file_type in ("json", "jsonl"):
                     # For JSON, return as list of dictionaries
                     # Convert DataFrame to records and then handle NumPy types
                     records = []
@@ -1714,23 +2251,12 @@ async def download_ingestion(
                 detail="Ingestion data file not found"
             )
         
-        # Read the parquet file
-        df = pd.read_parquet(parquet_path)
-        
         # Create a temporary file for the download
         with tempfile.NamedTemporaryFile(delete=False, suffix=f".{format}") as temp_file:
             temp_path = temp_file.name
-            
-            # Convert to requested format
-            if format == "csv":
-                df.to_csv(temp_path, index=False)
-                media_type = "text/csv"
-            elif format == "json":
-                df.to_json(temp_path, orient="records", lines=False)
-                media_type = "application/json"
-            else:  # parquet
-                df.to_parquet(temp_path, index=False)
-                media_type = "application/octet-stream"
+        
+        # Convert to requested format
+        media_type = export_parquet(parquet_path, temp_path, format)
         
         # Log activity
         log_activity(
@@ -1745,7 +2271,7 @@ async def download_ingestion(
             path=temp_path,
             filename=f"{job.name}.{format}",
             media_type=media_type,
-            background=BackgroundTasks().add_task(lambda: os.unlink(temp_path))
+            background=BackgroundTask(os.unlink, temp_path)  # Remove the temporary export once it is sent
         )
     except Exception as e:
         raise HTTPException(
@@ -2031,7 +2557,7 @@ async def preview_file(
         # For CSV files
         if file_info.type == "csv":
             # Read first 10 rows
-            with open(file_path, 'r', newline='', encoding='utf-8') as csvfile:
+            with open(file_path, 'r', newline='', encoding='utf-8-sig') as csvfile:
                 reader = csv.reader(csvfile)
                 headers = next(reader)
                 rows = []
@@ -2056,15 +2582,24 @@ async def preview_file(
             }
         
         # For JSON files
-        elif file_info.type == "json":
-            with open(file_path, 'r', encoding='utf-8') as jsonfile:
-                data = json.load(jsonfile)
-            
-            # If it's an array, limit to first 10 items
-            if isinstance(data, list):
-                preview_data = data[:10]
-            else:
-                preview_data = data
+        elif file_info.type in ("json", "jsonl"):
+            # Parse only as much of the document as the preview shows, whatever the file size
+            with open(file_path, 'rb') as jsonfile:
+                if file_info.type == "jsonl":
+                    preview_data, _ = read_ndjson_values(jsonfile, 0, 10)
+                    truncated = jsonfile.read(1) != b""
+                else:
+                    opening, data_start = json_document_start(jsonfile)
+                    if opening == "[":
+                        # First 10 items of the array
+                        preview_data, _ = read_json_values(jsonfile, data_start, 10)
+                        truncated = len(preview_data) == 10
+                    elif opening == "{":
+                        # First 10 top-level keys, within a read budget so one huge value cannot stall it
+                        preview_data, truncated = read_json_members(jsonfile, data_start, 10, PREVIEW_MAX_BYTES)
+                    else:
+                        jsonfile.seek(0)
+                        preview_data, truncated = json.load(jsonfile), False
             
             # Log activity
             log_activity(
@@ -2077,7 +2612,8 @@ async def preview_file(
             return {
                 "data": preview_data,
                 "filename": file_info.filename,
-                "type": "json"
+                "type": "json",
+                "truncated": truncated
             }
         
         else:
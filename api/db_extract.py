@@ -0,0 +1,343 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time
+from decimal import Decimal
+from sqlalchemy import MetaData, Table, select, and_, or_, inspect, func, text, true
+import pyarrow as pa
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Most concurrent range readers per job; each holds a connection to the source database
+MAX_PARALLEL_WORKERS = int(os.environ.get("SOURCE_DB_MAX_PARALLEL_WORKERS", 8))
+
+
+def reflect_table(conn, table_name):
+    """Reflect a source table so queries are quoted and paginated per dialect"""
+    return Table(table_name, MetaData(), autoload_with=conn)
+
+
+def estimate_row_count(conn, table):
+    """Estimate the row count from catalog statistics, falling back to COUNT(*) when none exist"""
+    dialect = conn.dialect.name
+    estimate = None
+    try:
+        if dialect == "postgresql":
+            estimate = conn.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+                {"name": table.name}
+            ).scalar()
+        elif dialect == "mysql":
+            estimate = conn.execute(
+                text("SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :name"),
+                {"name": table.name}
+            ).scalar()
+        elif dialect == "mssql":
+            estimate = conn.execute(
+                text("SELECT SUM(rows) FROM sys.partitions WHERE object_id = OBJECT_ID(:name) AND index_id IN (0, 1)"),
+                {"name": table.name}
+            ).scalar()
+        elif dialect == "sqlite":
+            # MAX(rowid) is an index lookup and a close upper bound for append-mostly tables
+            estimate = conn.execute(text(f'SELECT MAX(rowid) FROM "{table.name}"')).scalar()
+    except Exception as e:
+        logger.warning(f"Could not read row estimate for {table.name}: {str(e)}")
+
+    # Statistics can be missing (never analyzed) or negative (PostgreSQL uses -1 for unknown)
+    if estimate is None or estimate < 0:
+        estimate = conn.execute(select(func.count()).select_from(table)).scalar()
+    return int(estimate)
+
+
+def _unique_columns(inspector, table_name):
+    """Columns that a single-column unique index or constraint covers on their own"""
+    unique = set()
+    for index in inspector.get_indexes(table_name):
+        index_columns = index.get("column_names") or []
+        if index.get("unique") and len(index_columns) == 1:
+            unique.add(index_columns[0])
+    try:
+        constraints = inspector.get_unique_constraints(table_name)
+    except NotImplementedError:
+        constraints = []
+    for constraint in constraints:
+        constraint_columns = constraint.get("column_names") or []
+        if len(constraint_columns) == 1:
+            unique.add(constraint_columns[0])
+    return unique
+
+
+def discover_key_columns(conn, table_name, key_column=None):
+    """Find the ordered, non-null columns to seek on, or None when the table has no usable key"""
+    inspector = inspect(conn)
+    columns = {column["name"]: column for column in inspector.get_columns(table_name)}
+    primary_key = inspector.get_pk_constraint(table_name).get("constrained_columns") or []
+    unique_columns = [
+        column for column in _unique_columns(inspector, table_name)
+        if column in columns and not columns[column].get("nullable", True)
+    ]
+
+    if key_column:
+        if key_column not in columns:
+            raise ValueError(f"Key column '{key_column}' not found in table '{table_name}'")
+        if columns[key_column].get("nullable", True) and key_column not in primary_key:
+            logger.warning(f"Key column '{key_column}' is nullable; falling back to the primary key")
+        elif primary_key:
+            # Break ties on a non-unique column with the primary key so no rows are skipped
+            return [key_column] + [col for col in primary_key if col != key_column]
+        elif key_column in unique_columns:
+            return [key_column]
+        else:
+            # Seeking past the last value of a batch would skip rows that share it
+            logger.warning(
+                f"Key column '{key_column}' is not unique and table '{table_name}' has no primary key; "
+                f"ignoring it"
+            )
+
+    if primary_key:
+        return list(primary_key)
+
+    # Fall back to a single-column unique index or constraint on non-null columns
+    if unique_columns:
+        return [sorted(unique_columns)[0]]
+
+    return None
+
+
+def _to_python(value):
+    """Convert pandas/NumPy scalars into values DB-API drivers accept as parameters"""
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def last_key_values(chunk, key_columns):
+    """Key values of the last row of a batch, as parameters for the next seek"""
+    if isinstance(chunk, pa.Table):
+        return [chunk.column(column)[-1].as_py() for column in key_columns]
+    return [_to_python(chunk[column].iloc[-1]) for column in key_columns]
+
+
+def encode_key_values(values):
+    """Make key values JSON-serializable for storing in a checkpoint"""
+    encoded = []
+    for value in values:
+        if isinstance(value, (datetime, date, time)):
+            value = value.isoformat()
+        elif isinstance(value, Decimal):
+            value = str(value)
+        encoded.append(value)
+    return encoded
+
+
+def decode_key_values(table, key_columns, values):
+    """Restore checkpointed key values to the Python types of their columns"""
+    decoded = []
+    for column, value in zip(key_columns, values):
+        try:
+            python_type = table.c[column].type.python_type
+        except NotImplementedError:
+            python_type = None
+        if isinstance(value, str) and python_type in (datetime, date, time):
+            value = python_type.fromisoformat(value)
+        elif isinstance(value, str) and python_type is Decimal:
+            value = Decimal(value)
+        decoded.append(value)
+    return decoded
+
+
+def _arrow_type(column_type):
+    """Arrow type for a reflected column type, or None to let the values decide"""
+    try:
+        python_type = column_type.python_type
+    except NotImplementedError:
+        return None
+    if python_type is bool:
+        return pa.bool_()
+    if python_type is int:
+        return pa.int64()
+    if python_type is float:
+        return pa.float64()
+    if python_type is Decimal:
+        precision = getattr(column_type, "precision", None)
+        if precision and precision <= 38:
+            return pa.decimal128(precision, getattr(column_type, "scale", None) or 0)
+        return pa.float64()
+    if python_type is datetime:
+        # Aware values keep whatever zone the driver returns
+        return None if getattr(column_type, "timezone", False) else pa.timestamp("us")
+    if python_type is date:
+        return pa.date32()
+    if python_type is time:
+        return pa.time64("us")
+    if python_type is str:
+        return pa.string()
+    if python_type is bytes:
+        return pa.binary()
+    return None
+
+
+def arrow_column_types(table):
+    """Arrow types of a reflected table's columns, for those that map onto one"""
+    column_types = {}
+    for column in table.columns:
+        arrow_type = _arrow_type(column.type)
+        if arrow_type is not None:
+            column_types[column.name] = arrow_type
+    return column_types
+
+
+def batch_to_table(chunk, column_types):
+    """Convert a fetched batch to Arrow with the source's column types.
+
+    Types inferred from a single batch depend on its values: a column that is NULL throughout
+    the first page would otherwise fix the whole output file to strings.
+    """
+    if isinstance(chunk, pd.DataFrame):
+        chunk = pa.Table.from_pandas(chunk, preserve_index=False)
+    for index, name in enumerate(chunk.column_names):
+        target = column_types.get(name)
+        if target is not None and not chunk.schema.field(index).type.equals(target):
+            chunk = chunk.set_column(index, name, chunk.column(index).cast(target))
+    return chunk
+
+
+def _seek_predicate(table, key_columns, last_values):
+    """Build (k1 > v1) OR (k1 = v1 AND k2 > v2) ... without relying on row-value support"""
+    clauses = []
+    for i, column in enumerate(key_columns):
+        parts = [table.c[key] == value for key, value in zip(key_columns[:i], last_values[:i])]
+        parts.append(table.c[column] > last_values[i])
+        clauses.append(and_(*parts))
+    return or_(*clauses)
+
+
+def iter_keyset_batches(conn, table, key_columns, chunk_size, last_values=None, where=None):
+    """Yield DataFrames ordered by the key, seeking past the last key value of each batch"""
+    order_by = [table.c[column] for column in key_columns]
+    while True:
+        query = select(table).order_by(*order_by).limit(chunk_size)
+        if where is not None:
+            query = query.where(where)
+        if last_values is not None:
+            query = query.where(_seek_predicate(table, key_columns, last_values))
+
+        chunk = pd.read_sql(query, conn)
+        if chunk.empty:
+            return
+
+        last_values = last_key_values(chunk, key_columns)
+        yield chunk
+
+        if len(chunk) < chunk_size:
+            return
+
+
+def iter_offset_batches(conn, table, chunk_size, offset=0):
+    """Yield DataFrames using LIMIT/OFFSET paging for tables without a usable key"""
+    while True:
+        query = select(table).limit(chunk_size).offset(offset)
+        chunk = pd.read_sql(query, conn)
+        if chunk.empty:
+            return
+
+        offset += len(chunk)
+        yield chunk
+
+        if len(chunk) < chunk_size:
+            return
+
+
+def iter_streaming_batches(conn, table, chunk_size):
+    """Yield Arrow tables from a single server-side cursor, fetching chunk_size rows at a time"""
+    result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(select(table))
+    names = list(result.keys())
+    try:
+        while True:
+            rows = result.fetchmany(chunk_size)
+            if not rows:
+                return
+            # Transpose straight into Arrow columns instead of going through a row-wise DataFrame
+            columns = zip(*rows)
+            yield pa.Table.from_arrays([pa.array(column) for column in columns], names=names)
+    finally:
+        result.close()
+
+
+def can_partition(column_type):
+    """Whether plan_key_ranges can split a column of this reflected type into ranges"""
+    try:
+        python_type = column_type.python_type
+    except NotImplementedError:
+        return False
+    return python_type is not bool and issubclass(python_type, (int, date))
+
+
+def plan_key_ranges(conn, table, column, partitions):
+    """Split an integer or datetime column into contiguous [lower, upper) ranges using its min/max"""
+    lowest, highest = conn.execute(select(func.min(table.c[column]), func.max(table.c[column]))).one()
+    if lowest is None:
+        return []
+
+    if isinstance(lowest, (datetime, date)):
+        step = (highest - lowest) / partitions
+        bounds = [lowest + step * i for i in range(1, partitions)]
+    elif isinstance(lowest, int):
+        step = (highest - lowest + 1) / partitions
+        bounds = [lowest + int(step * i) for i in range(1, partitions)]
+    else:
+        raise ValueError(f"Partition column '{column}' must be an integer or datetime column")
+
+    # Collapse duplicate bounds on narrow key spaces; open ends catch rows outside the sampled min/max
+    edges = [None] + sorted(set(bound for bound in bounds if lowest < bound <= highest)) + [None]
+    return [(edges[i], edges[i + 1]) for i in range(len(edges) - 1)]
+
+
+def _range_predicate(table, column, lower, upper):
+    clauses = []
+    if lower is not None:
+        clauses.append(table.c[column] >= lower)
+    if upper is not None:
+        clauses.append(table.c[column] < upper)
+    return and_(*clauses) if clauses else true()
+
+
+def extract_ranges_parallel(engine, table, key_columns, column, ranges, chunk_size, on_batch, workers, last_values=None):
+    """Extract each key range on its own pooled connection.
+
+    on_batch(chunk, range_index) is called serially for every batch; if it raises, the other
+    ranges stop at their next batch and the error is re-raised. last_values optionally
+    holds, per range, the key values to resume after (None to start at the range's lower bound).
+    """
+    lock = threading.Lock()
+    last_values = last_values or [None] * len(ranges)
+    # Set once on_batch raises (e.g. the job was cancelled) so the other ranges stop at their next batch
+    stop = threading.Event()
+
+    def extract_range(index):
+        lower, upper = ranges[index]
+        extracted = 0
+        if stop.is_set():
+            return extracted
+        with engine.connect() as conn:
+            where = _range_predicate(table, column, lower, upper)
+            for chunk in iter_keyset_batches(conn, table, key_columns, chunk_size, last_values[index], where=where):
+                # The Parquet writer and job session are not thread-safe, so hand batches over one at a time
+                with lock:
+                    if stop.is_set():
+                        return extracted
+                    try:
+                        on_batch(chunk, index)
+                    except BaseException:
+                        stop.set()
+                        raise
+                extracted += len(chunk)
+        logger.info(f"Extracted {extracted} rows for range [{lower}, {upper})")
+        return extracted
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(extract_range, range(len(ranges))))
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from cryptography.fernet import Fernet
+from sqlalchemy import create_engine, inspect
+
+logger = logging.getLogger(__name__)
+
+# Pool settings for external data sources, overridable from the environment
+ENGINE_POOL_SIZE = int(os.environ.get("SOURCE_DB_POOL_SIZE", 5))
+ENGINE_MAX_OVERFLOW = int(os.environ.get("SOURCE_DB_MAX_OVERFLOW", 5))
+ENGINE_POOL_RECYCLE = int(os.environ.get("SOURCE_DB_POOL_RECYCLE", 1800))  # Max connection lifetime in seconds
+ENGINE_IDLE_TIMEOUT = int(os.environ.get("SOURCE_DB_IDLE_TIMEOUT", 600))  # Dispose engines unused this long
+SCHEMA_CACHE_TTL = int(os.environ.get("SOURCE_SCHEMA_CACHE_TTL", 300))  # Seconds to serve reflected metadata
+# Directories an admin allows SQLite sources to be read from (os.pathsep-separated); none by default
+SQLITE_SOURCE_DIRS = [
+    os.path.realpath(path) for path in os.environ.get("SQLITE_SOURCE_DIRS", "").split(os.pathsep) if path
+]
+
+# Fields that identify a connection; table-level options must not split the registry
+CONNECTION_FIELDS = ["host", "port", "database", "username", "password"]
+# Key for connection secrets stored on ingestion jobs; without it a key file is created on the shared data directory
+SOURCE_CREDENTIALS_KEY = os.environ.get("SOURCE_CREDENTIALS_KEY")
+SOURCE_CREDENTIALS_KEY_FILE = Path(
+    os.environ.get("SOURCE_CREDENTIALS_KEY_FILE", Path(__file__).parent / "data" / ".source_credentials.key")
+)
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+# Reflected metadata keyed by (connection key, table); table None holds the table listing
+_schema_cache = {}
+_schema_cache_lock = threading.Lock()
+
+
+def get_required_db_fields(db_type, include_table=True):
+    """Get the connection fields required for a database type"""
+    fields = ["database"] if db_type == "sqlite" else ["host", "port", "database", "username"]
+    return fields + ["table"] if include_table else fields
+
+def resolve_sqlite_path(database):
+    """Resolve a SQLite source file, which must already exist inside one of SQLITE_SOURCE_DIRS"""
+    if not SQLITE_SOURCE_DIRS:
+        raise ValueError("SQLite sources are not enabled on this server")
+    path = os.path.realpath(database)
+    if not any(os.path.commonpath([path, directory]) == directory for directory in SQLITE_SOURCE_DIRS):
+        raise ValueError("SQLite source is outside the allowed directories")
+    if not os.path.isfile(path):
+        raise ValueError("SQLite source file not found")
+    return path
+
+def create_connection_string(db_type, config):
+    """Create a database connection string"""
+    if db_type == "mysql":
+        return f"mysql+pymysql://{config['username']}:{config['password']}@{config['host']}:{config['port']}/{config['database']}"
+    elif db_type == "postgresql":
+        return f"postgresql://{config['username']}:{config['password']}@{config['host']}:{config['port']}/{config['database']}"
+    elif db_type == "sqlite":
+        # Read-only, so a source can never be modified or created by opening it
+        return f"sqlite:///file:{resolve_sqlite_path(config['database'])}?mode=ro&uri=true"
+    elif db_type == "mssql":
+        return f"mssql+pyodbc://{config['username']}:{config['password']}@{config['host']}:{config['port']}/{config['database']}?driver=ODBC+Driver+17+for+SQL+Server"
+    else:
+        raise ValueError(f"Unsupported database type: {db_type}")
+
+def _credentials_cipher():
+    key = SOURCE_CREDENTIALS_KEY
+    if not key:
+        SOURCE_CREDENTIALS_KEY_FILE.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # O_EXCL so API and worker nodes starting together agree on a single key
+            fd = os.open(SOURCE_CREDENTIALS_KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "wb") as key_file:
+                key_file.write(Fernet.generate_key())
+        except FileExistsError:
+            pass
+        key = SOURCE_CREDENTIALS_KEY_FILE.read_bytes().strip()
+    return Fernet(key)
+
+def seal_source_config(config):
+    """Copy of a connection config that is safe to store, with the password encrypted"""
+    sealed = {field: value for field, value in config.items() if field != "password"}
+    if config.get("password"):
+        token = _credentials_cipher().encrypt(config["password"].encode("utf-8"))
+        sealed["password_encrypted"] = token.decode("ascii")
+    return sealed
+
+def open_source_config(sealed):
+    """Connection config with the password decrypted again, for the worker that runs the job"""
+    config = {field: value for field, value in sealed.items() if field != "password_encrypted"}
+    if sealed.get("password_encrypted"):
+        token = sealed["password_encrypted"].encode("ascii")
+        config["password"] = _credentials_cipher().decrypt(token).decode("utf-8")
+    return config
+
+def connection_key(db_type, config):
+    """Hash the connection config so credentials are never kept as registry keys"""
+    identity = {field: str(config.get(field, "")) for field in CONNECTION_FIELDS}
+    identity["type"] = db_type
+    return hashlib.sha256(json.dumps(identity, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class _EngineEntry:
+    def __init__(self, engine, pool_size):
+        self.engine = engine
+        self.pool_size = pool_size
+        self.last_used = time.monotonic()
+
+
+def get_engine(db_type, config, pool_size=None):
+    """Get a pooled engine for an external source, reusing warm connections across requests"""
+    pool_size = max(pool_size or 0, ENGINE_POOL_SIZE)
+    key = connection_key(db_type, config)
+
+    with _engines_lock:
+        _evict_idle_engines()
+
+        entry = _engines.get(key)
+        if entry is None or entry.pool_size < pool_size:
+            if entry is not None:
+                # Checked-out connections finish normally; the old pool closes them on return
+                logger.info(f"Growing connection pool for {db_type} source to {pool_size}")
+                entry.engine.dispose()
+            engine = create_engine(
+                create_connection_string(db_type, config),
+                pool_size=pool_size,
+                max_overflow=ENGINE_MAX_OVERFLOW,
+                pool_recycle=ENGINE_POOL_RECYCLE,
+                pool_pre_ping=True
+            )
+            entry = _EngineEntry(engine, pool_size)
+            _engines[key] = entry
+
+        entry.last_used = time.monotonic()
+        return entry.engine
+
+
+def _evict_idle_engines():
+    """Dispose engines that have been idle too long and hold no checked-out connections"""
+    now = time.monotonic()
+    for key, entry in list(_engines.items()):
+        if now - entry.last_used > ENGINE_IDLE_TIMEOUT and entry.engine.pool.checkedout() == 0:
+            entry.engine.dispose()
+            del _engines[key]
+
+
+def dispose_engines():
+    """Dispose every cached engine, e.g. on application shutdown"""
+    with _engines_lock:
+        for entry in _engines.values():
+            entry.engine.dispose()
+        _engines.clear()
+
+
+def _cached_metadata(cache_key, loader):
+    """Serve reflected metadata from the cache, reloading it once the TTL has passed"""
+    now = time.monotonic()
+    with _schema_cache_lock:
+        entry = _schema_cache.get(cache_key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+    # Reflect outside the lock so a slow server does not block lookups for other sources
+    value = loader()
+    with _schema_cache_lock:
+        _schema_cache[cache_key] = (now + SCHEMA_CACHE_TTL, value)
+    return value
+
+
+def get_cached_table_names(db_type, config):
+    """List the tables of a source, served from the metadata cache"""
+    engine = get_engine(db_type, config)
+    cache_key = (connection_key(db_type, config), None)
+    return _cached_metadata(cache_key, lambda: set(inspect(engine).get_table_names()))
+
+
+def get_cached_columns(db_type, config, table):
+    """Reflect the columns of a source table, served from the metadata cache"""
+    engine = get_engine(db_type, config)
+    cache_key = (connection_key(db_type, config), table)
+    return _cached_metadata(cache_key, lambda: inspect(engine).get_columns(table))
+
+
+def invalidate_schema_cache(db_type, config, table=None):
+    """Drop cached metadata for a source, or for one table and the source's table listing"""
+    key = connection_key(db_type, config)
+    with _schema_cache_lock:
+        for cache_key in list(_schema_cache):
+            if cache_key[0] == key and (table is None or cache_key[1] in (None, table)):
+                del _schema_cache[cache_key]
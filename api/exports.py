@@ -0,0 +1,17 @@
+import pandas as pd
+
+# Media type of each download format
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "json": "application/json", "parquet": "application/octet-stream"}
+
+
+def export_parquet(parquet_path, output_path, format):
+    """Write an ingestion's Parquet output to output_path in the download format; returns its media type"""
+    df = pd.read_parquet(parquet_path)
+    if format == "csv":
+        df.to_csv(output_path, index=False)
+    elif format == "json":
+        # Typed date and timestamp columns would otherwise be written as epoch numbers
+        df.to_json(output_path, orient="records", lines=False, date_format="iso")
+    else:
+        df.to_parquet(output_path, index=False)
+    return EXPORT_MEDIA_TYPES.get(format, EXPORT_MEDIA_TYPES["parquet"])
@@ -0,0 +1,181 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from .models import SessionLocal, IngestionJob
+from .job_events import job_event_bus
+
+logger = logging.getLogger(__name__)
+
+# How often a worker process looks for cancellations requested through the database
+CANCEL_POLL_SECONDS = float(os.environ.get("INGEST_CANCEL_POLL_SECONDS", 0.5))
+# A running job's progress is written to its row at most this often, unless it moved this many percent
+PROGRESS_FLUSH_SECONDS = float(os.environ.get("INGEST_PROGRESS_FLUSH_SECONDS", 2))
+PROGRESS_FLUSH_PERCENT = int(os.environ.get("INGEST_PROGRESS_FLUSH_PERCENT", 5))
+
+
+class JobCancelled(Exception):
+    """Raised inside an ingestion worker once its job has been cancelled"""
+
+
+# Jobs being processed by (or dispatched from) this process, so a resume never runs a job twice
+_active_jobs = set()
+# Cancellation requests for active jobs, with the monotonic time they were made
+_cancel_requests = {}
+# Latest progress of active jobs, ahead of what has been written to the database
+_live_progress = {}
+_lock = threading.Lock()
+_watcher = None
+# In a scheduler worker process, the queue that carries progress back to the dispatching process
+_progress_relay = None
+
+
+def mark_job_active(job_id):
+    with _lock:
+        _active_jobs.add(job_id)
+
+
+def mark_job_inactive(job_id):
+    """Forget a job once its worker has exited, along with any pending cancellation"""
+    with _lock:
+        _active_jobs.discard(job_id)
+        _cancel_requests.pop(job_id, None)
+        _live_progress.pop(job_id, None)
+
+
+def is_job_active(job_id):
+    with _lock:
+        return job_id in _active_jobs
+
+
+def request_cancel(job_id, requested_at=None):
+    """Ask the job's worker to stop at its next batch; returns False if no worker is running it.
+
+    requested_at is the wall-clock time of a request made in another process, so the
+    reported stop time covers the whole delay.
+    """
+    requested = time.monotonic()
+    if requested_at is not None:
+        requested -= max((datetime.now() - requested_at).total_seconds(), 0.0)
+    with _lock:
+        if job_id not in _active_jobs:
+            return False
+        _cancel_requests.setdefault(job_id, requested)
+        return True
+
+
+def check_cancelled(job_id):
+    """Raise JobCancelled if the job has been cancelled; workers call this between batches"""
+    with _lock:
+        cancelled = job_id in _cancel_requests
+    if cancelled:
+        raise JobCancelled(job_id)
+
+
+def cancel_stop_seconds(job_id):
+    """Seconds between the cancellation request and now, i.e. how long the worker took to stop"""
+    with _lock:
+        requested = _cancel_requests.get(job_id)
+    return None if requested is None else round(time.monotonic() - requested, 3)
+
+
+def watch_cancellations():
+    """Relay cancellations stored on IngestionJob rows to the jobs running in this process"""
+    global _watcher
+    with _lock:
+        if _watcher is not None:
+            return
+        _watcher = threading.Thread(target=_watch_cancellations, name="cancel-watcher", daemon=True)
+    _watcher.start()
+
+
+def _watch_cancellations():
+    while True:
+        time.sleep(CANCEL_POLL_SECONDS)
+        with _lock:
+            job_ids = [job_id for job_id in _active_jobs if job_id not in _cancel_requests]
+        if not job_ids:
+            continue
+        db = SessionLocal()
+        try:
+            requests = (
+                db.query(IngestionJob.id, IngestionJob.cancel_requested_at)
+                .filter(IngestionJob.id.in_(job_ids), IngestionJob.cancel_requested_at.isnot(None))
+                .all()
+            )
+            for job_id, requested_at in requests:
+                request_cancel(job_id, requested_at)
+        except Exception as e:
+            logger.error(f"Error checking for cancelled jobs: {str(e)}")
+        finally:
+            db.close()
+
+
+def set_live_progress(job_id, progress, rows=None):
+    with _lock:
+        if job_id not in _active_jobs:
+            return
+        _live_progress[job_id] = progress
+    if _progress_relay is not None:
+        _progress_relay.put((job_id, progress, rows))
+    if rows is None:
+        job_event_bus.publish(job_id, progress=progress)
+    else:
+        job_event_bus.publish(job_id, progress=progress, rows=rows)
+
+
+def get_live_progress(job_id):
+    """In-memory progress of a job processed by (or dispatched from) this process, or None"""
+    with _lock:
+        return _live_progress.get(job_id)
+
+
+def relay_progress(queue):
+    """Worker process initializer: send live progress back to the process that dispatched the job"""
+    global _progress_relay
+    _progress_relay = queue
+
+
+def receive_progress(queue):
+    """Record progress relayed by worker processes until None is received"""
+    while True:
+        item = queue.get()
+        if item is None:
+            return
+        set_live_progress(*item)
+
+
+class ProgressTracker:
+    """Keep a running job's progress in memory and write it to the job row only now and then.
+
+    update() is cheap enough to call for every batch: the row is committed only once
+    PROGRESS_FLUSH_SECONDS have passed or progress moved PROGRESS_FLUSH_PERCENT, so small
+    chunks do not turn into a write transaction each. flush() commits the session, saving
+    anything else pending on the job (e.g. a checkpoint) along with the progress.
+    """
+
+    def __init__(self, job, session, flush_seconds=None, flush_percent=None):
+        self.job = job
+        self.job_id = job.id
+        self.session = session
+        self.flush_seconds = flush_seconds or PROGRESS_FLUSH_SECONDS
+        self.flush_percent = flush_percent or PROGRESS_FLUSH_PERCENT
+        self.progress = job.progress or 0
+        self._flushed_progress = self.progress
+        self._flushed_at = time.monotonic()
+        set_live_progress(self.job_id, self.progress)
+
+    def update(self, progress, rows=None):
+        self.progress = progress
+        self.job.progress = progress
+        set_live_progress(self.job_id, progress, rows)
+        if (progress - self._flushed_progress >= self.flush_percent
+                or time.monotonic() - self._flushed_at >= self.flush_seconds):
+            self.flush()
+
+    def flush(self):
+        self.session.commit()
+        self._flushed_progress = self.progress
+        self._flushed_at = time.monotonic()
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# How often the rows of watched jobs are re-read, for jobs run by other worker nodes
+JOB_EVENTS_POLL_SECONDS = float(os.environ.get("JOB_EVENTS_POLL_SECONDS", 2))
+# Longest silence on an event stream before a keep-alive comment is sent
+JOB_EVENTS_KEEPALIVE_SECONDS = float(os.environ.get("JOB_EVENTS_KEEPALIVE_SECONDS", 15))
+
+
+class JobSubscription:
+    """Snapshots for the jobs one watcher follows, delivered on the watcher's event loop.
+
+    Updates that arrive faster than the watcher reads them are coalesced, so a slow client
+    only ever receives the newest state of each job.
+    """
+
+    def __init__(self, bus, job_ids):
+        self.bus = bus
+        self.job_ids = set(job_ids)
+        self._loop = asyncio.get_running_loop()
+        self._pending = {}
+        self._ready = asyncio.Event()
+
+    def push(self, snapshot):
+        """Queue a snapshot from any thread"""
+        self._loop.call_soon_threadsafe(self._store, snapshot)
+
+    def _store(self, snapshot):
+        self._pending[snapshot["id"]] = snapshot
+        self._ready.set()
+
+    async def get(self, timeout=None):
+        """Wait for the next snapshots; returns an empty list if none came within timeout"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        snapshots, self._pending = list(self._pending.values()), {}
+        return snapshots
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class JobEventBus:
+    """In-process fan-out of ingestion job state to any number of watchers.
+
+    publish() is cheap and safe to call from any thread; it does nothing for jobs nobody
+    watches and skips snapshots that did not change. refresh() and the poller read current
+    state through loader(job_ids) -> {job_id: snapshot}, so every watcher of a job shares a
+    single database read instead of polling on its own.
+    """
+
+    def __init__(self, loader=None, poll_seconds=None):
+        self.loader = loader
+        self.poll_seconds = poll_seconds or JOB_EVENTS_POLL_SECONDS
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._latest = {}
+        self._poller = None
+
+    def subscribe(self, job_ids):
+        """Start watching jobs; must be called from the event loop the watcher reads on.
+
+        The new watcher is sent the current state of each job straight away, including jobs
+        that other watchers already follow and whose snapshots publish() would skip.
+        """
+        subscription = JobSubscription(self, job_ids)
+        with self._lock:
+            for job_id in subscription.job_ids:
+                self._subscribers.setdefault(job_id, set()).add(subscription)
+            if self._poller is None and self.loader is not None:
+                self._poller = threading.Thread(target=self._poll, name="job-events-poller", daemon=True)
+                self._poller.start()
+        self.refresh(subscription.job_ids)
+        with self._lock:
+            snapshots = [self._latest.get(job_id, {"id": job_id}) for job_id in subscription.job_ids]
+        for snapshot in snapshots:
+            subscription.push(snapshot)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for job_id in subscription.job_ids:
+                watchers = self._subscribers.get(job_id)
+                if watchers is None:
+                    continue
+                watchers.discard(subscription)
+                if not watchers:
+                    del self._subscribers[job_id]
+                    self._latest.pop(job_id, None)
+
+    def watched_jobs(self):
+        with self._lock:
+            return list(self._subscribers)
+
+    def publish(self, job_id, **fields):
+        """Merge fields into a job's snapshot and push it to the job's watchers if it changed"""
+        with self._lock:
+            watchers = self._subscribers.get(job_id)
+            if not watchers:
+                return
+            previous = self._latest.get(job_id, {"id": job_id})
+            snapshot = {**previous, **fields}
+            if snapshot == previous:
+                return
+            self._latest[job_id] = snapshot
+            watchers = list(watchers)
+        for subscription in watchers:
+            subscription.push(snapshot)
+
+    def refresh(self, job_ids):
+        """Publish the current state of watched jobs, e.g. right after a request changed them"""
+        job_ids = [job_id for job_id in job_ids if job_id in self._subscribers]
+        if not job_ids or self.loader is None:
+            return
+        for job_id, snapshot in self.loader(job_ids).items():
+            self.publish(job_id, **snapshot)
+
+    def _poll(self):
+        # Catches changes made outside this process, such as jobs on other worker nodes
+        while True:
+            threading.Event().wait(self.poll_seconds)
+            try:
+                self.refresh(self.watched_jobs())
+            except Exception as e:
+                logger.error(f"Error refreshing watched jobs: {str(e)}")
+
+
+# Shared by the API routes, the scheduler and the progress relay of this process
+job_event_bus = JobEventBus()
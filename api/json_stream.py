@@ -0,0 +1,194 @@
+import codecs
+import json
+import os
+import re
+
+# Bytes pulled from disk per read while decoding
+JSON_READ_SIZE = 1 << 16
+# Largest single array item decoded; past this an item that still does not parse is treated as invalid
+JSON_MAX_VALUE_BYTES = int(os.environ.get("INGEST_JSON_MAX_VALUE_BYTES", 64 << 20))
+
+# End of one object inside an array and the start of the next: "}, {"
+RECORD_BOUNDARY = re.compile(r"\}\s*,\s*(?=\{)")
+SEPARATORS = re.compile(r"[\s,]*")
+# An object member's key and the colon after it
+MEMBER_KEY = re.compile(r'("(?:[^"\\]|\\.)*")\s*:\s*')
+
+_decoder = json.JSONDecoder()
+
+
+def json_document_start(f):
+    """Return the opening character of the document ('[' or '{') and the byte offset just after it"""
+    f.seek(0)
+    head = f.read(JSON_READ_SIZE)
+    start = len(codecs.BOM_UTF8) if head.startswith(codecs.BOM_UTF8) else 0
+    start += len(head[start:]) - len(head[start:].lstrip())
+    if start >= len(head):
+        raise ValueError("Invalid JSON file")
+    return chr(head[start]), start + 1
+
+
+def read_json_values(f, offset, count, synced=True):
+    """Decode up to count array items starting at a byte offset of a binary file.
+
+    When synced is False the offset may fall anywhere, so decoding starts at the next
+    '}, {' boundary. Returns the values and the byte offset just past the last one.
+    Raises ValueError for an item that is still incomplete after JSON_MAX_VALUE_BYTES.
+    """
+    f.seek(offset)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    state = {"buf": "", "eof": False}
+
+    def fill(pending):
+        # Grow reads with the undecoded text so a large item is re-decoded only a few times
+        data = f.read(max(JSON_READ_SIZE, pending))
+        state["eof"] = not data
+        state["buf"] += decoder.decode(data, final=state["eof"])
+
+    fill(0)
+    pos = 0
+    if not synced:
+        while True:
+            match = RECORD_BOUNDARY.search(state["buf"], max(pos - 64, 0))
+            if match:
+                pos = match.end()
+                break
+            if state["eof"] or len(state["buf"]) > JSON_MAX_VALUE_BYTES:
+                return [], None
+            pos = len(state["buf"])
+            fill(pos)
+
+    values = []
+    while len(values) < count:
+        pos = SEPARATORS.match(state["buf"], pos).end()
+        if pos >= len(state["buf"]):
+            if state["eof"]:
+                break
+            fill(0)
+            continue
+        if state["buf"][pos] in "]}":
+            break
+        try:
+            value, end = _decoder.raw_decode(state["buf"], pos)
+            if end == len(state["buf"]) and not state["eof"]:
+                # A number at the end of the buffer may continue in the next read
+                raise json.JSONDecodeError("Value may continue", state["buf"], end)
+        except json.JSONDecodeError:
+            if state["eof"] or len(state["buf"]) - pos > JSON_MAX_VALUE_BYTES:
+                if synced:
+                    raise ValueError("Invalid JSON file")
+                break
+            fill(len(state["buf"]) - pos)
+            continue
+        values.append(value)
+        pos = end
+
+    return values, offset + len(state["buf"][:pos].encode("utf-8"))
+
+
+def read_ndjson_values(f, offset, count, synced=True):
+    """Decode up to count newline-delimited JSON values starting at a byte offset of a binary file.
+
+    When synced is False the offset may fall mid-line, so the partial line is skipped first.
+    Blank lines are ignored. Returns the values and the byte offset just past the last line read.
+    """
+    f.seek(offset)
+    if not synced:
+        f.readline()
+
+    values = []
+    while len(values) < count:
+        line = f.readline()
+        if not line:
+            break
+        if not line.strip():
+            continue
+        try:
+            values.append(json.loads(line))
+        except ValueError:
+            if synced:
+                raise ValueError("Invalid JSON file")
+    return values, f.tell()
+
+
+def iter_json_batches(f, batch_size, ndjson=False, offset=None):
+    """Yield (values, bytes consumed) batches of top-level items from a binary JSON file.
+
+    Arrays and NDJSON streams are decoded incrementally, so memory is bounded by the
+    batch rather than the file, and can resume from a byte offset yielded earlier.
+    Any other document is yielded as a single value.
+    """
+    if ndjson:
+        offset = offset or 0
+        while True:
+            values, offset = read_ndjson_values(f, offset, batch_size)
+            if not values:
+                return
+            yield values, offset
+
+    opening, data_start = json_document_start(f)
+    offset = offset or data_start
+    if opening != "[":
+        f.seek(0)
+        try:
+            value = json.load(f)
+        except json.JSONDecodeError:
+            raise ValueError("Invalid JSON file")
+        yield [value], f.tell()
+        return
+
+    while True:
+        values, offset = read_json_values(f, offset, batch_size)
+        if not values:
+            return
+        yield values, offset
+
+
+def read_json_members(f, offset, count, max_bytes=None):
+    """Decode up to count members of an object whose '{' ends just before a byte offset.
+
+    Reading stops early once max_bytes have been pulled from disk and the next member is
+    still incomplete, so a huge value cannot force the whole file into memory. Returns the
+    members and whether the object continues past them.
+    """
+    f.seek(offset)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    state = {"buf": "", "eof": False, "read": 0}
+
+    def fill():
+        if max_bytes is not None and state["read"] >= max_bytes:
+            return False
+        # Grow reads with the buffer so a large value is not re-decoded once per small read
+        data = f.read(max(JSON_READ_SIZE, len(state["buf"])))
+        state["read"] += len(data)
+        state["eof"] = not data
+        state["buf"] += decoder.decode(data, final=state["eof"])
+        return True
+
+    fill()
+    pos = 0
+    members = {}
+    while True:
+        pos = SEPARATORS.match(state["buf"], pos).end()
+        if pos < len(state["buf"]) and state["buf"][pos] == "}":
+            return members, False
+        if len(members) >= count:
+            return members, True
+
+        key_match = MEMBER_KEY.match(state["buf"], pos)
+        try:
+            if not key_match:
+                raise json.JSONDecodeError("Expecting property name", state["buf"], pos)
+            value, end = _decoder.raw_decode(state["buf"], key_match.end())
+            if end == len(state["buf"]) and not state["eof"]:
+                # A number at the end of the buffer may continue in the next read
+                raise json.JSONDecodeError("Value may continue", state["buf"], end)
+        except json.JSONDecodeError:
+            if state["eof"]:
+                raise ValueError("Invalid JSON file")
+            if not fill():
+                return members, True
+            continue
+
+        members[json.loads(key_match.group(1))] = value
+        pos = end
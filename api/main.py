@@ -8,10 +8,12 @@ from pathlib import Path
 
 from api.models import get_db, User
 from api.auth import router as auth_router
-from api.datapuur import router as datapuur_router
+from api.datapuur import router as datapuur_router, scheduler
 from api.kginsights import router as kginsights_router
 from api.admin import router as admin_router
 from api.middleware import ActivityLoggerMiddleware
+from api.db_sources import dispose_engines
+from api.scheduler import EMBEDDED_SCHEDULER
 
 # # Run database migrations
 # try:
@@ -102,6 +104,17 @@ async def startup_event():
         print("Updated role permissions")
     except Exception as e:
         print(f"Error updating role permissions: {str(e)}")
+    
+    # Run queued ingestion jobs in this process too; jobs interrupted by a restart are requeued
+    # once their worker lease expires and continue from their checkpoints
+    if EMBEDDED_SCHEDULER:
+        scheduler.start()
+
+# Stop dispatching ingestion jobs and close pooled connections to external data sources
+@app.on_event("shutdown")
+async def shutdown_event():
+    scheduler.stop()
+    dispose_engines()
 
 # Mount static files directory if it exists
 static_dir = Path(__file__).parent / "static"
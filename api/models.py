@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index
+from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 import os
@@ -116,6 +116,32 @@ class IngestionJob(Base):
     error = Column(Text, nullable=True)
     duration = Column(String, nullable=True)
     config = Column(Text, nullable=True)  # Store config as JSON string
+    metrics = Column(Text, nullable=True)  # Store run metrics (row counts, coercion errors, ...) as JSON string
+    checkpoint = Column(Text, nullable=True)  # Last durable position (committed parts, rows, input offset or key) as JSON string
+    source_config = Column(Text, nullable=True)  # Source connection as JSON string (password encrypted), kept only while the job can be resumed
+    queued_at = Column(DateTime, nullable=True)  # When the job last entered the queue
+    dispatched_at = Column(DateTime, nullable=True)  # When a worker process picked the job up
+    cancel_requested_at = Column(DateTime, nullable=True)  # Set by /cancel-job for the job's worker process to act on
+    worker_id = Column(String, nullable=True)  # Scheduler (host:pid) holding the job's lease
+    heartbeat_at = Column(DateTime, nullable=True)  # Last lease renewal by that scheduler
+    lease_expires_at = Column(DateTime, nullable=True)  # After this the job is requeued for another worker
+    owner = Column(String, nullable=True)  # Username that started the job, for per-user scheduling
+    owner_role = Column(String, nullable=True)  # That user's role when the job was queued, for its fair-share weight
+    priority = Column(Integer, default=0)  # Higher runs first; changed by admins
+
+def add_missing_columns():
+    """Add columns introduced after a table was first created, since create_all never alters tables"""
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
 
 # Create tables
 Base.metadata.create_all(bind=engine)
+add_missing_columns()
@@ -0,0 +1,187 @@
+import os
+import shutil
+from pathlib import Path
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+def _widens(current, new):
+    """Whether a column of type `new` needs the output column of type `current` widened"""
+    return pa.types.is_integer(current) and pa.types.is_floating(new)
+
+
+class ParquetChunkWriter:
+    """Append chunks to a single Parquet file, one row group per chunk"""
+
+    def __init__(self, output_file, schema=None, compression="snappy"):
+        self.output_file = Path(output_file)
+        self.schema = schema
+        self.compression = compression
+        self.rows_written = 0
+        self.row_groups = 0
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def _open(self, schema):
+        # Columns that are entirely null in the first chunk have no usable type yet,
+        # so store them as strings instead of locking the file to the null type
+        fields = [
+            pa.field(field.name, pa.string(), nullable=True) if pa.types.is_null(field.type) else field
+            for field in schema
+        ]
+        self.schema = pa.schema(fields, metadata=schema.metadata)
+        self._writer = pq.ParquetWriter(str(self.output_file), self.schema, compression=self.compression)
+
+    def write_frame(self, df):
+        """Write a pandas DataFrame as a new row group"""
+        self.write_table(pa.Table.from_pandas(df, preserve_index=False))
+
+    def write_table(self, table):
+        """Write an Arrow table as a new row group"""
+        if self._writer is None:
+            self._open(self.schema or table.schema)
+        if not table.schema.equals(self.schema, check_metadata=False):
+            # Columns added to the output after this chunk was written are null in it
+            for field in self.schema:
+                if field.name not in table.column_names:
+                    table = table.append_column(field, pa.nulls(table.num_rows, field.type))
+            # Later chunks may infer slightly different types; keep the file schema stable
+            table = table.select(self.schema.names).cast(self.schema)
+        self._writer.write_table(table)
+        self.rows_written += table.num_rows
+        self.row_groups += 1
+
+    def close(self):
+        """Close the underlying writer and finalize the Parquet footer"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class PartParquetWriter:
+    """Write a Parquet output as numbered part files so committed row groups survive a crash.
+
+    Row groups go to an in-progress part; commit() closes it, syncs it to disk and renames
+    it into place. Reopening with the number of committed parts drops anything written
+    after the last commit. finish() merges the parts, in order, into the output file; the
+    parts stay until remove_parts(), so a run that stops before its completion is recorded
+    can still be resumed.
+    A table with columns the output does not have yet starts a new part with those columns
+    appended; earlier parts get them as nulls when merged. Likewise a float column in a table
+    widens an integer column of the output, and earlier parts are cast when merged.
+    """
+
+    def __init__(self, output_file, committed_parts=0, compression="snappy"):
+        self.output_file = Path(output_file)
+        self.parts_dir = self.output_file.with_name(self.output_file.name + ".parts")
+        self.parts_dir.mkdir(exist_ok=True)
+        self.committed_parts = committed_parts
+        self.compression = compression
+        self.schema = None
+        self.rows_written = 0
+        self.pending_rows = 0
+        self._part = None
+
+        # Parts past the checkpoint and unfinished parts were never committed
+        for path in self.parts_dir.iterdir():
+            if path.suffix != ".parquet" or int(path.stem.split("-")[1]) >= committed_parts:
+                path.unlink()
+        if committed_parts:
+            # Later parts must keep the schema of the ones already on disk; the last is the widest
+            self.schema = pq.read_schema(self._part_path(committed_parts - 1))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.abort()
+        return False
+
+    def _part_path(self, index):
+        return self.parts_dir / f"part-{index:05d}.parquet"
+
+    def write_frame(self, df):
+        """Write a pandas DataFrame as a new row group"""
+        self.write_table(pa.Table.from_pandas(df, preserve_index=False))
+
+    def write_table(self, table):
+        """Write an Arrow table as a new row group of the in-progress part"""
+        if self.schema is not None:
+            added = [field for field in table.schema if field.name not in self.schema.names]
+            widened = {
+                field.name: field.type for field in table.schema
+                if field.name in self.schema.names and _widens(self.schema.field(field.name).type, field.type)
+            }
+            if added or widened:
+                # A Parquet file has a single schema, so new or wider columns go to a new part
+                self.commit()
+                fields = [field.with_type(widened.get(field.name, field.type)) for field in self.schema]
+                self.schema = pa.schema(fields + added, metadata=self.schema.metadata)
+        if self._part is None:
+            in_progress = self._part_path(self.committed_parts).with_suffix(".tmp")
+            self._part = ParquetChunkWriter(in_progress, self.schema, self.compression)
+        self._part.write_table(table)
+        self.schema = self._part.schema
+        self.rows_written += table.num_rows
+        self.pending_rows += table.num_rows
+
+    def commit(self):
+        """Make everything written so far durable and return the number of committed parts"""
+        if self._part is None:
+            return self.committed_parts
+        self._part.close()
+        in_progress = self._part.output_file
+        with open(in_progress, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(in_progress, self._part_path(self.committed_parts))
+        self._part = None
+        self.committed_parts += 1
+        self.pending_rows = 0
+        return self.committed_parts
+
+    def abort(self):
+        """Drop the in-progress part; committed parts are kept for a later resume"""
+        if self._part is not None:
+            self._part.close()
+            self._part.output_file.unlink(missing_ok=True)
+            self._part = None
+            self.pending_rows = 0
+
+    def finish(self):
+        """Commit the open part and merge all parts into the output file, keeping the parts"""
+        self.commit()
+        merged = self.output_file.with_name(self.output_file.name + ".tmp")
+        if self.committed_parts == 1:
+            # A hard link publishes the only part without copying it or taking it away from a resume
+            merged.unlink(missing_ok=True)
+            try:
+                os.link(self._part_path(0), merged)
+            except OSError:
+                shutil.copyfile(self._part_path(0), merged)
+            os.replace(merged, self.output_file)
+        elif self.committed_parts > 1:
+            with ParquetChunkWriter(merged, self.schema, self.compression) as writer:
+                for index in range(self.committed_parts):
+                    part = pq.ParquetFile(self._part_path(index))
+                    # Copy one row group at a time so memory stays bounded by the chunk size
+                    for group in range(part.num_row_groups):
+                        writer.write_table(part.read_row_group(group))
+            os.replace(merged, self.output_file)
+
+    def remove_parts(self):
+        """Delete the part files once the job's completion is recorded"""
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
+
+
+def remove_partial_output(output_file):
+    """Delete a job's output file, its part files and any unfinished merge"""
+    output_file = Path(output_file)
+    shutil.rmtree(output_file.with_name(output_file.name + ".parts"), ignore_errors=True)
+    output_file.with_name(output_file.name + ".tmp").unlink(missing_ok=True)
+    output_file.unlink(missing_ok=True)
@@ -0,0 +1,428 @@
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from sqlalchemy import or_, func
+
+from .models import SessionLocal, IngestionJob
+from .job_control import mark_job_active, mark_job_inactive, relay_progress, receive_progress
+from .job_events import job_event_bus
+
+logger = logging.getLogger(__name__)
+
+# Ingestion jobs run at the same time; each gets its own worker process
+INGEST_MAX_WORKERS = int(os.environ.get("INGEST_MAX_WORKERS", 2))
+# How often the queue is checked when nothing wakes the scheduler
+SCHEDULER_POLL_SECONDS = float(os.environ.get("INGEST_SCHEDULER_POLL_SECONDS", 2))
+# A claimed job belongs to its worker until the lease runs out; leases are renewed several times per period
+LEASE_SECONDS = float(os.environ.get("INGEST_LEASE_SECONDS", 60))
+# Whether the API process dispatches jobs itself; disable when only `python -m api.worker` nodes should
+EMBEDDED_SCHEDULER = os.environ.get("INGEST_EMBEDDED_SCHEDULER", "true").lower() in ("1", "true", "yes")
+# Running jobs allowed per user across all workers
+MAX_JOBS_PER_USER = int(os.environ.get("INGEST_MAX_JOBS_PER_USER", 2))
+# Share of the workers each role's users get when several users are waiting, as "role:weight,..."
+ROLE_WEIGHTS = {
+    role.strip(): float(weight)
+    for role, weight in (
+        item.split(":") for item in os.environ.get("INGEST_ROLE_WEIGHTS", "admin:2,researcher:1,user:1").split(",") if item
+    )
+}
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def role_weight(role):
+    return ROLE_WEIGHTS.get(role, 1.0)
+
+
+def queued_jobs(db):
+    """Queued jobs, highest priority and then oldest first"""
+    return (
+        db.query(IngestionJob)
+        .filter(IngestionJob.status == "queued")
+        .order_by(IngestionJob.priority.desc(), IngestionJob.queued_at, IngestionJob.id)
+    )
+
+
+def running_counts(db):
+    """Running jobs per owner, across every worker"""
+    rows = (
+        db.query(IngestionJob.owner, func.count(IngestionJob.id))
+        .filter(IngestionJob.status == "running")
+        .group_by(IngestionJob.owner)
+        .all()
+    )
+    return dict(rows)
+
+
+def order_queue(jobs, running):
+    """Put queued jobs in dispatch order.
+
+    Higher priorities always go first. Within a priority, each next job goes to the owner with
+    the fewest running-plus-already-ordered jobs relative to their role weight, so users share
+    the workers fairly however many jobs each has queued; an owner's own jobs stay oldest first.
+    """
+    counts = dict(running)
+    owners = {}
+    for job in sorted(jobs, key=lambda job: (-(job.priority or 0), job.queued_at or datetime.min, job.id)):
+        owners.setdefault(job.owner, deque()).append(job)
+
+    ordered = []
+    while owners:
+        top = max(queue[0].priority or 0 for queue in owners.values())
+        candidates = [owner for owner, queue in owners.items() if (queue[0].priority or 0) == top]
+        owner = min(candidates, key=lambda owner: (
+            counts.get(owner, 0) / role_weight(owners[owner][0].owner_role),
+            owners[owner][0].queued_at or datetime.min,
+            owners[owner][0].id
+        ))
+        ordered.append(owners[owner].popleft())
+        counts[owner] = counts.get(owner, 0) + 1
+        if not owners[owner]:
+            del owners[owner]
+    return ordered
+
+
+def queue_position(db, job):
+    """1-based position of a queued job in dispatch order, or None if it is not waiting"""
+    if job.status != "queued":
+        return None
+    ordered = order_queue(queued_jobs(db).all(), running_counts(db))
+    for position, queued in enumerate(ordered, start=1):
+        if queued.id == job.id:
+            return position
+    return None
+
+
+def queue_depth_by_user(db):
+    """Queued and running jobs per owner, with the weight and cap the scheduler applies to them"""
+    depth = {}
+    rows = (
+        db.query(IngestionJob.owner, IngestionJob.owner_role, IngestionJob.status, func.count(IngestionJob.id))
+        .filter(IngestionJob.status.in_(["queued", "running"]))
+        .group_by(IngestionJob.owner, IngestionJob.owner_role, IngestionJob.status)
+        .all()
+    )
+    for owner, role, status, count in rows:
+        entry = depth.setdefault(owner, {
+            "username": owner,
+            "role": role,
+            "queued": 0,
+            "running": 0,
+            "weight": role_weight(role),
+            "max_running": MAX_JOBS_PER_USER
+        })
+        entry[status] += count
+    return sorted(depth.values(), key=lambda entry: (-entry["queued"], entry["username"] or ""))
+
+
+def queue_wait_seconds(job):
+    """Time spent waiting for a worker: so far for queued jobs, until dispatch (or a cancel) for the others"""
+    if job.status == "queued":
+        until = datetime.now()
+    else:
+        until = job.dispatched_at or job.end_time
+    if job.queued_at is None or until is None:
+        return None
+    return round(max((until - job.queued_at).total_seconds(), 0.0), 3)
+
+
+def claim_job(db, job_id, worker_id, lease_seconds=LEASE_SECONDS):
+    """Atomically move a queued job to running under a lease; False if a cancel or another worker got there first"""
+    now = datetime.now()
+    claimed = (
+        db.query(IngestionJob)
+        .filter(IngestionJob.id == job_id, IngestionJob.status == "queued")
+        .update({
+            "status": "running",
+            "dispatched_at": now,
+            "worker_id": worker_id,
+            "heartbeat_at": now,
+            "lease_expires_at": now + timedelta(seconds=lease_seconds)
+        }, synchronize_session=False)
+    )
+    db.commit()
+    return claimed == 1
+
+
+def renew_leases(db, job_ids, worker_id, lease_seconds=LEASE_SECONDS):
+    """Heartbeat for the jobs a worker is running; returns how many leases it still held"""
+    if not job_ids:
+        return 0
+    now = datetime.now()
+    renewed = (
+        db.query(IngestionJob)
+        .filter(
+            IngestionJob.id.in_(job_ids),
+            IngestionJob.status == "running",
+            IngestionJob.worker_id == worker_id
+        )
+        .update({
+            "heartbeat_at": now,
+            "lease_expires_at": now + timedelta(seconds=lease_seconds)
+        }, synchronize_session=False)
+    )
+    db.commit()
+    return renewed
+
+
+def requeue_jobs(db, condition):
+    """Hand running jobs matching condition back to the queue; they resume from their checkpoints"""
+    requeued = (
+        db.query(IngestionJob)
+        .filter(IngestionJob.status == "running", condition)
+        .update({
+            "status": "queued",
+            "dispatched_at": None,
+            "worker_id": None,
+            "lease_expires_at": None
+        }, synchronize_session=False)
+    )
+    db.commit()
+    return requeued
+
+
+def reap_expired_leases(db):
+    """Requeue running jobs whose worker stopped heartbeating, e.g. because its node died"""
+    # Jobs started before leases existed have none and are treated as expired
+    expired = or_(IngestionJob.lease_expires_at.is_(None), IngestionJob.lease_expires_at < datetime.now())
+    requeued = requeue_jobs(db, expired)
+    if requeued:
+        logger.warning(f"Requeued {requeued} ingestion jobs with expired worker leases")
+    return requeued
+
+
+class _TrackingContext:
+    """Multiprocessing context that keeps a handle on every worker process a pool starts"""
+
+    def __init__(self, context):
+        self._context = context
+        self.processes = []
+
+    def Process(self, *args, **kwargs):
+        process = self._context.Process(*args, **kwargs)
+        self.processes.append(process)
+        return process
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
+
+
+class IngestionScheduler:
+    """Dispatch queued ingestion jobs to a bounded pool of worker processes.
+
+    Jobs are taken from the "queued" rows of the ingestion_jobs table, oldest first, so the
+    queue survives restarts and request handlers only insert a row and call wake(). At most
+    max_workers jobs run at once; run_job(job_id) executes a claimed job in a worker process
+    and must be a module-level function so it can be sent to a spawned process.
+
+    Several schedulers (the API process and any `python -m api.worker` nodes) can share one
+    metadata database: claims are atomic, each scheduler heartbeats the leases of its jobs,
+    and every scheduler requeues jobs whose lease has expired.
+
+    Dispatch follows order_queue(): priority first, then weighted fair shares across users,
+    skipping users who already have max_jobs_per_user jobs running.
+    """
+
+    def __init__(self, run_job, max_workers=None, poll_seconds=None, worker_id=None, lease_seconds=None,
+                 max_jobs_per_user=None):
+        self.run_job = run_job
+        self.max_workers = max(max_workers or INGEST_MAX_WORKERS, 1)
+        self.max_jobs_per_user = max(max_jobs_per_user or MAX_JOBS_PER_USER, 1)
+        self.lease_seconds = lease_seconds or LEASE_SECONDS
+        # Heartbeats must come several times per lease, whatever the poll interval
+        self.poll_seconds = min(poll_seconds or SCHEDULER_POLL_SECONDS, self.lease_seconds / 4)
+        self.worker_id = worker_id or default_worker_id()
+        self._running = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._pool = None
+        self._pool_context = None
+        self._thread = None
+        # Live progress from worker processes, so /job-status does not have to wait for the job row
+        self._progress_queue = None
+        self._progress_thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._loop, name="ingestion-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"Ingestion scheduler {self.worker_id} started with {self.max_workers} worker processes")
+
+    def stop(self):
+        """Stop dispatching and hand unfinished jobs back to the queue for another worker to resume"""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._pool is not None:
+            # Without heartbeats the jobs would be requeued anyway, so stop the workers instead of
+            # letting them run on alongside whichever worker resumes the job
+            for process in self._pool_context.processes:
+                if process.is_alive():
+                    process.terminate()
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            self._pool_context = None
+        if self._progress_queue is not None:
+            self._progress_queue.put(None)
+            # A worker terminated mid-write can leave the queue unreadable; do not hang shutdown on it
+            self._progress_thread.join(timeout=5)
+            self._progress_queue = None
+            self._progress_thread = None
+
+        db = SessionLocal()
+        try:
+            requeued = requeue_jobs(db, IngestionJob.worker_id == self.worker_id)
+            if requeued:
+                logger.info(f"Returned {requeued} unfinished ingestion jobs to the queue")
+        finally:
+            db.close()
+
+    def wake(self):
+        """Check the queue now instead of at the next poll, e.g. after a job was queued"""
+        self._wake.set()
+
+    def running_jobs(self):
+        with self._lock:
+            return list(self._running)
+
+    def _loop(self):
+        while not self._stopping.is_set():
+            self._wake.clear()
+            try:
+                self._maintain_leases()
+                self._dispatch_ready()
+            except Exception as e:
+                logger.error(f"Error dispatching ingestion jobs: {str(e)}")
+            self._wake.wait(self.poll_seconds)
+
+    def _start_pool(self):
+        # Spawned workers do not inherit the API process's threads, locks or open sessions
+        context = _TrackingContext(multiprocessing.get_context("spawn"))
+        if self._progress_queue is None:
+            self._progress_queue = context.Queue()
+            self._progress_thread = threading.Thread(
+                target=receive_progress, args=(self._progress_queue,), name="ingestion-progress", daemon=True
+            )
+            self._progress_thread.start()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=relay_progress,
+            initargs=(self._progress_queue,)
+        )
+        self._pool_context = context
+
+    def _discard_pool(self, pool):
+        """Shut down a broken pool so the next dispatch starts a new one"""
+        with self._lock:
+            if self._pool is not pool:
+                return  # Already replaced, e.g. by another job of the same broken pool
+            self._pool = None
+            self._pool_context = None
+        # Not waiting: this may run on the pool's own management thread
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _maintain_leases(self):
+        db = SessionLocal()
+        try:
+            running = self.running_jobs()
+            renewed = renew_leases(db, running, self.worker_id, self.lease_seconds)
+            if renewed < len(running):
+                logger.warning(f"Worker {self.worker_id} lost the lease of {len(running) - renewed} running jobs")
+            reap_expired_leases(db)
+        finally:
+            db.close()
+
+    def _dispatch_ready(self):
+        with self._lock:
+            free = self.max_workers - len(self._running)
+        if free <= 0:
+            return
+
+        db = SessionLocal()
+        try:
+            running = running_counts(db)
+            dispatched = 0
+            for job in order_queue(queued_jobs(db).all(), running):
+                if dispatched >= free:
+                    break
+                if running.get(job.owner, 0) >= self.max_jobs_per_user:
+                    continue
+                job_id = job.id
+                if not claim_job(db, job_id, self.worker_id, self.lease_seconds):
+                    continue
+                running[job.owner] = running.get(job.owner, 0) + 1
+                dispatched += 1
+                if self._pool is None:
+                    self._start_pool()
+                pool = self._pool
+                mark_job_active(job_id)
+                try:
+                    future = pool.submit(self.run_job, job_id)
+                except RuntimeError as e:
+                    # The pool broke since the last dispatch; hand the job back to the queue
+                    logger.error(f"Could not dispatch ingestion job {job_id}: {str(e)}")
+                    self._discard_pool(pool)
+                    mark_job_inactive(job_id)
+                    self._requeue(db, job_id)
+                    continue
+                with self._lock:
+                    self._running[job_id] = future
+                future.add_done_callback(lambda future, job_id=job_id, pool=pool: self._on_done(job_id, future, pool))
+                job_event_bus.publish(job_id, status="running", queue_position=None)
+                logger.info(f"Dispatched ingestion job {job_id} for {job.owner} (priority {job.priority})")
+            if dispatched:
+                depth = {entry["username"]: entry["queued"] for entry in queue_depth_by_user(db)}
+                logger.info(f"Ingestion queue depth by user: {depth}")
+        finally:
+            db.close()
+
+    def _on_done(self, job_id, future, pool):
+        with self._lock:
+            self._running.pop(job_id, None)
+        mark_job_inactive(job_id)
+
+        error = None if future.cancelled() else future.exception()
+        if error is not None and not self._stopping.is_set():
+            logger.error(f"Worker for ingestion job {job_id} failed: {str(error)}")
+            if isinstance(error, BrokenProcessPool):
+                # A crashed worker breaks the whole pool; the next dispatch starts a new one
+                self._discard_pool(pool)
+            self._mark_failed(job_id, f"Ingestion worker exited unexpectedly: {str(error)}")
+        try:
+            # The worker wrote the final state to the job row; tell anyone watching the job
+            job_event_bus.refresh([job_id])
+        except Exception as e:
+            logger.error(f"Error publishing final state of ingestion job {job_id}: {str(e)}")
+        self.wake()
+
+    def _requeue(self, db, job_id):
+        requeue_jobs(db, IngestionJob.id == job_id)
+
+    def _mark_failed(self, job_id, message):
+        # The job's checkpoint is kept, so it can still be resumed; without one the connection details go
+        db = SessionLocal()
+        try:
+            job = db.query(IngestionJob).filter(IngestionJob.id == job_id).first()
+            if job is not None and job.status in ("queued", "running"):
+                job.status = "failed"
+                job.error = message
+                job.end_time = datetime.now()
+                if not job.checkpoint:
+                    job.source_config = None
+                db.commit()
+        finally:
+            db.close()
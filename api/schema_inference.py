@@ -0,0 +1,547 @@
+import csv
+import io
+import json
+import os
+from pathlib import Path
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+from .json_stream import json_document_start, read_json_values, read_ndjson_values
+
+# Patterns mirror what int() and float() accept for plain numeric text
+INTEGER_PATTERN = r"^\s*[+-]?\d+\s*$"
+FLOAT_PATTERN = r"^\s*[+-]?((\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?|(?i:inf|infinity|nan))\s*$"
+
+# Most specific type wins when a column mixes kinds of values
+CSV_TYPE_PRECEDENCE = ["string", "datetime", "date", "boolean", "float", "integer"]
+
+# Types that widen into one another; a column mixing families is text
+COMPATIBLE_TYPES = [{"integer", "float"}, {"date", "datetime"}, {"boolean"}, {"string"}]
+
+# Native Arrow types for JSON schema types; everything else is stored as text
+JSON_ARROW_TYPES = {"integer": pa.int64(), "float": pa.float64(), "boolean": pa.bool_()}
+
+# Number of evenly spaced blocks read across the file in stratified sampling mode
+SAMPLE_BLOCKS = 10
+
+
+def unique_column_names(names):
+    """Name blank columns and number repeated ones the way pandas.read_csv does ("Unnamed: 2", "a.1")"""
+    names = [name if name else f"Unnamed: {index}" for index, name in enumerate(names)]
+    counts = {}
+    for index, original in enumerate(names):
+        name = original
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[original] = count + 1
+            name = f"{original}.{count}"
+            # Skip numbers taken by a column that already has that name
+            count = count + 1 if name in names else counts.get(name, 0)
+        names[index] = name
+        counts[name] = count + 1
+    return names
+
+
+def read_csv_header(file_path):
+    """Read the header row of a CSV file.
+
+    Every reader takes its column names from here, so a UTF-8 byte order mark (as written
+    by Excel) is dropped once instead of ending up in the first column's name, and blank or
+    repeated names are made unique once for the schema and every engine.
+    """
+    with open(file_path, 'r', newline='', encoding='utf-8-sig') as csvfile:
+        return unique_column_names(next(csv.reader(csvfile)))
+
+
+def open_csv_reader(file_path, headers, block_size=1 << 20, skip_rows=0):
+    """Open a streaming Arrow CSV reader, from a path or binary file, that keeps every column as raw text"""
+    return pa_csv.open_csv(
+        file_path,
+        # The header line is skipped in favour of the names from read_csv_header
+        read_options=pa_csv.ReadOptions(
+            block_size=block_size, column_names=headers, skip_rows=1, skip_rows_after_names=skip_rows
+        ),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={header: pa.string() for header in headers},
+            strings_can_be_null=False,
+            quoted_strings_can_be_null=False
+        )
+    )
+
+
+def read_csv_sample(file_path, rows):
+    """Read the first rows of a CSV file into Arrow string columns"""
+    headers = read_csv_header(file_path)
+    reader = open_csv_reader(file_path, headers)
+    batches = []
+    collected = 0
+    for batch in reader:
+        batches.append(batch)
+        collected += batch.num_rows
+        if collected >= rows:
+            break
+    table = pa.Table.from_batches(batches, schema=reader.schema)
+    return table.slice(0, rows)
+
+
+def read_csv_stratified_sample(file_path, rows, blocks=SAMPLE_BLOCKS):
+    """Read rows from evenly spaced byte offsets across a CSV file into Arrow string columns"""
+    headers = read_csv_header(file_path)
+    options = {
+        "read_options": pa_csv.ReadOptions(column_names=headers),
+        # A block that starts inside a quoted multi-line field yields rows with the wrong width
+        "parse_options": pa_csv.ParseOptions(invalid_row_handler=lambda row: "skip"),
+        "convert_options": pa_csv.ConvertOptions(
+            column_types={header: pa.string() for header in headers},
+            strings_can_be_null=False,
+            quoted_strings_can_be_null=False
+        )
+    }
+    file_size = os.path.getsize(file_path)
+    rows_per_block = max(-(-rows // blocks), 1)
+    tables = []
+
+    with open(file_path, 'rb') as f:
+        f.readline()  # Header
+        data_start = f.tell()
+        block_end = data_start
+        for block in range(blocks):
+            offset = data_start + (file_size - data_start) * block // blocks
+            if offset <= block_end:
+                # Blocks overlap on small files; continue where the previous block stopped
+                f.seek(block_end)
+            else:
+                f.seek(offset)
+                f.readline()  # Skip the partial record at the seek position
+
+            lines = []
+            for _ in range(rows_per_block):
+                line = f.readline()
+                if not line:
+                    break
+                lines.append(line)
+            block_end = f.tell()
+            if not lines:
+                break
+
+            try:
+                tables.append(pa_csv.read_csv(io.BytesIO(b"".join(lines)), **options))
+            except pa.ArrowInvalid:
+                continue
+
+    if not tables:
+        return read_csv_sample(file_path, rows)
+    return pa.concat_tables(tables).slice(0, rows)
+
+
+def type_confidence(field_type, observed, complete=False):
+    """Confidence that a type inferred from `observed` non-empty values holds for the whole file.
+
+    complete means the values are all of the file's values, so the type is known to hold.
+    """
+    if observed == 0:
+        return 0.0
+    if field_type == "string" or complete:
+        return 1.0  # Text admits any value
+    # Rule of three: with no counterexample among n values, the 95% upper bound on the miss rate is 3/n
+    return round(max(0.0, 1 - 3 / observed), 4)
+
+
+def _masks(values):
+    """Yield (type, mask) pairs in the order the scalar parser used to try them"""
+    yield "integer", pc.match_substring_regex(values, INTEGER_PATTERN)
+    yield "float", pc.match_substring_regex(values, FLOAT_PATTERN)
+    yield "boolean", pc.is_in(pc.utf8_lower(values), value_set=pa.array(["true", "false"]))
+    yield "date", pc.is_valid(pc.strptime(values, format="%Y-%m-%d", unit="s", error_is_null=True))
+    yield "datetime", pc.is_valid(pc.strptime(values, format="%Y-%m-%dT%H:%M:%S", unit="s", error_is_null=True))
+
+
+def non_empty_mask(values):
+    """True where a string value holds something other than whitespace"""
+    return pc.fill_null(pc.not_equal(pc.utf8_trim_whitespace(values), ""), False)
+
+
+def classify_column(values):
+    """Return the set of value types present in a string column, ignoring blank values"""
+    values = values.combine_chunks() if isinstance(values, pa.ChunkedArray) else values
+    remaining = non_empty_mask(values)
+    types = set()
+
+    for type_name, mask in _masks(values):
+        if not pc.any(remaining).as_py():
+            return types
+        hits = pc.and_(remaining, pc.fill_null(mask, False))
+        if pc.any(hits).as_py():
+            types.add(type_name)
+            remaining = pc.and_not(remaining, hits)
+
+    if pc.any(remaining).as_py():
+        types.add("string")
+    return types
+
+
+def resolve_type(types):
+    """Pick the final schema type for a column from the types seen in it"""
+    # Values from unrelated families (say numbers and dates) can only be kept losslessly as text
+    if not any(types <= family for family in COMPATIBLE_TYPES):
+        return "string"
+    for type_name in CSV_TYPE_PRECEDENCE:
+        if type_name in types:
+            return type_name
+    return "string"  # Default
+
+
+def first_non_empty(values):
+    """First non-blank value of a string column, or None"""
+    index = pc.index(non_empty_mask(values), True).as_py()
+    return values[index].as_py() if index >= 0 else None
+
+
+def infer_csv_schema(file_path, sample_rows=1000, sampling="head"):
+    """Infer a schema from a CSV sample using vectorized Arrow kernels"""
+    table = read_csv_stratified_sample(file_path, sample_rows) if sampling == "stratified" else None
+    complete = False
+    if table is None or table.num_rows < sample_rows:
+        # A read from the start that ends before sample_rows has seen the whole file
+        head = read_csv_sample(file_path, sample_rows)
+        complete = head.num_rows < sample_rows
+        if table is None or complete:
+            table = head
+    schema = {"name": Path(file_path).stem, "fields": []}
+
+    for header, values in zip(table.column_names, table.columns):
+        field_type = resolve_type(classify_column(values))
+        observed = pc.sum(non_empty_mask(values)).as_py() or 0
+        schema["fields"].append({
+            "name": header,
+            "type": field_type,
+            "nullable": True,  # Assume nullable by default
+            "sample": first_non_empty(values),
+            "confidence": type_confidence(field_type, observed, complete)
+        })
+
+    return schema
+
+
+def _coerce_values(values, field_type):
+    """Cast trimmed string values to the Arrow type for a schema type; unparseable values become null"""
+    if field_type == "integer":
+        # Arrow's integer parser rejects a leading '+'; longer digit runs would overflow int64
+        digits = pc.replace_substring_regex(values, r"^\+", "")
+        valid = pc.match_substring_regex(digits, r"^-?\d{1,18}$")
+        return pc.cast(pc.if_else(valid, digits, None), pa.int64())
+    if field_type == "float":
+        valid = pc.match_substring_regex(values, FLOAT_PATTERN)
+        return pc.cast(pc.if_else(valid, values, None), pa.float64())
+    if field_type == "boolean":
+        lowered = pc.utf8_lower(values)
+        valid = pc.is_in(lowered, value_set=pa.array(["true", "false"]))
+        return pc.if_else(valid, pc.equal(lowered, "true"), None)
+    if field_type == "date":
+        parsed = pc.strptime(values, format="%Y-%m-%d", unit="s", error_is_null=True)
+        return pc.cast(parsed, pa.date32())
+    if field_type == "datetime":
+        # Date-only values are allowed in datetime columns and land at midnight
+        return pc.coalesce(
+            pc.strptime(values, format="%Y-%m-%dT%H:%M:%S", unit="s", error_is_null=True),
+            pc.strptime(values, format="%Y-%m-%d", unit="s", error_is_null=True)
+        )
+    return None
+
+
+def coerce_table(table, fields):
+    """Cast string columns to the native types named in schema fields.
+
+    Blank values become nulls. An integer column holding values with a fraction or exponent
+    is written as float rather than losing them. Returns the typed table and, per column, the
+    number of non-blank values that could not be parsed as the column's type (also written as null).
+    """
+    field_types = {field["name"]: field.get("type", "string") for field in fields}
+    columns = []
+    errors = {}
+
+    for name, values in zip(table.column_names, table.columns):
+        field_type = field_types.get(name, "string")
+        values = values.combine_chunks() if isinstance(values, pa.ChunkedArray) else values
+        if field_type in ("string", "object", "array", "null") or not pa.types.is_string(values.type):
+            columns.append(values)
+            continue
+
+        present = non_empty_mask(values)
+        trimmed = pc.if_else(present, pc.utf8_trim_whitespace(values), None)
+        typed = _coerce_values(trimmed, field_type)
+        if field_type == "integer":
+            rejected = pc.and_(present, pc.is_null(typed))
+            if pc.any(pc.and_(rejected, pc.match_substring_regex(trimmed, FLOAT_PATTERN))).as_py():
+                typed = _coerce_values(trimmed, "float")
+        failed = pc.sum(pc.and_(present, pc.is_null(typed))).as_py() or 0
+        if failed:
+            errors[name] = failed
+        columns.append(typed)
+
+    return pa.Table.from_arrays(columns, names=table.column_names), errors
+
+
+def empty_csv_table(headers, fields):
+    """A typed table with no rows, so a CSV file holding only a header still gets an output file"""
+    columns = [pa.array([], type=pa.string()) for _ in headers]
+    return coerce_table(pa.Table.from_arrays(columns, names=headers), fields)[0]
+
+
+def sample_json_records(file_path, records, blocks=SAMPLE_BLOCKS):
+    """Decode records from evenly spaced byte offsets across a top-level JSON array.
+
+    Returns None when the document is not an array. Mid-file blocks resync on the next
+    '}, {' boundary and keep only objects sharing keys with the first block, so objects
+    nested inside a record are not mistaken for records.
+    """
+    file_size = os.path.getsize(file_path)
+    per_block = max(-(-records // blocks), 1)
+
+    with open(file_path, 'rb') as f:
+        opening, data_start = json_document_start(f)
+        if opening != "[":
+            return None
+
+        sampled, block_end = read_json_values(f, data_start, per_block)
+        reference_keys = set()
+        for record in sampled:
+            if isinstance(record, dict):
+                reference_keys.update(record.keys())
+
+        for block in range(1, blocks):
+            offset = data_start + (file_size - data_start) * block // blocks
+            synced = offset <= block_end
+            values, end = read_json_values(f, block_end if synced else offset, per_block, synced=synced)
+            if end is None:
+                continue
+            block_end = end
+            if not synced and reference_keys:
+                values = [value for value in values if isinstance(value, dict) and reference_keys & value.keys()]
+            sampled.extend(values)
+
+    return sampled[:records]
+
+
+def head_json_records(file_path, records):
+    """Decode the first records of a top-level JSON array, or None when the document is not an array"""
+    with open(file_path, 'rb') as f:
+        opening, data_start = json_document_start(f)
+        if opening != "[":
+            return None
+        return read_json_values(f, data_start, records)[0]
+
+
+def json_value_types(values):
+    """Return the JSON type name of each value, classifying all strings in one vectorized pass"""
+    types = []
+    strings = []
+    for value in values:
+        if value is None:
+            types.append("null")
+        elif isinstance(value, bool):
+            types.append("boolean")
+        elif isinstance(value, int):
+            types.append("integer")
+        elif isinstance(value, float):
+            types.append("float")
+        elif isinstance(value, str):
+            types.append(None)  # Filled in below
+            strings.append(value)
+        elif isinstance(value, list):
+            types.append("array")
+        elif isinstance(value, dict):
+            types.append("object")
+        else:
+            types.append("string")  # Default
+
+    if strings:
+        array = pa.array(strings, type=pa.string())
+        dates = pc.is_valid(pc.strptime(array, format="%Y-%m-%d", unit="s", error_is_null=True)).to_pylist()
+        datetimes = pc.is_valid(pc.strptime(array, format="%Y-%m-%dT%H:%M:%S", unit="s", error_is_null=True)).to_pylist()
+        string_types = iter(
+            "date" if is_date else "datetime" if is_datetime else "string"
+            for is_date, is_datetime in zip(dates, datetimes)
+        )
+        types = [type_name or next(string_types) for type_name in types]
+
+    return types
+
+
+def resolve_json_type(types):
+    """Pick the most specific schema type for the JSON types seen in a field"""
+    for type_name in ["object", "array", "string", "boolean", "float", "integer", "null"]:
+        if type_name in types:
+            return type_name
+    return "string"  # Default
+
+
+def sample_ndjson_records(file_path, records, blocks=SAMPLE_BLOCKS):
+    """Decode records from evenly spaced byte offsets across a newline-delimited JSON file"""
+    file_size = os.path.getsize(file_path)
+    per_block = max(-(-records // blocks), 1)
+    sampled = []
+    block_end = 0
+
+    with open(file_path, 'rb') as f:
+        for block in range(blocks):
+            offset = file_size * block // blocks
+            # Blocks overlap on small files; continue where the previous block stopped
+            synced = offset <= block_end
+            values, block_end = read_ndjson_values(f, block_end if synced else offset, per_block, synced=synced)
+            sampled.extend(values)
+            if block_end >= file_size:
+                break
+
+    return sampled[:records]
+
+
+def flatten_record(record, prefix=""):
+    """Flatten nested objects into dotted keys; arrays, scalars and empty objects stay as values"""
+    flat = {}
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            flat.update(flatten_record(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+
+def _json_text(value):
+    """Keep strings as-is and serialize any other JSON value"""
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def _matches_json_type(value, field_type):
+    if field_type == "integer":
+        return isinstance(value, int) and not isinstance(value, bool) and -2 ** 63 <= value < 2 ** 63
+    if field_type == "float":
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return isinstance(value, bool)
+
+
+def _lookup(record, name):
+    """Value of a dotted field in a nested record, or None when any level is missing"""
+    if name in record:
+        return record[name]
+    value = record
+    for part in name.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _flatten_struct(name, array, leaves):
+    """Collect the leaf arrays of a nested struct array under dotted names"""
+    if pa.types.is_struct(array.type) and array.type.num_fields:
+        # Struct flattening carries parent nulls down to the children
+        for child, child_array in zip(array.type, array.flatten()):
+            _flatten_struct(f"{name}.{child.name}", child_array, leaves)
+    else:
+        leaves[name] = array
+
+
+def _native_column(array, field_type):
+    """Cast an inferred Arrow array to the field's column type, or None if it needs per-value conversion"""
+    arrow_type = JSON_ARROW_TYPES.get(field_type, pa.string())
+    if pa.types.is_null(array.type) or array.type == arrow_type:
+        return array.cast(arrow_type)
+    if field_type == "float" and pa.types.is_integer(array.type):
+        return array.cast(arrow_type)
+    return None
+
+
+def _convert_values(values, field_type):
+    """Convert Python values to the field's column type; returns the array and the number of mismatches"""
+    arrow_type = JSON_ARROW_TYPES.get(field_type)
+    if arrow_type is None:
+        return pa.array([None if value is None else _json_text(value) for value in values], type=pa.string()), 0
+    matched = [value if value is None or _matches_json_type(value, field_type) else None for value in values]
+    failed = sum(1 for value, kept in zip(values, matched) if value is not None and kept is None)
+    return pa.array(matched, type=arrow_type), failed
+
+
+def _unseen_keys(record, names, keys, prefix=""):
+    """Add the flattened keys of a record that no field covers, skipping covered subtrees"""
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if name in names:
+            continue  # A field for an object keeps its whole value as JSON
+        if isinstance(value, dict) and value:
+            _unseen_keys(value, names, keys, f"{name}.")
+        else:
+            keys.add(name)
+
+
+def unseen_fields(records, fields):
+    """Schema fields for keys in a batch of decoded records that the given fields do not cover.
+
+    A key is covered by a field of the same name or of any of its parent objects. New fields
+    are typed from this batch's values, the same way schema detection types them.
+    """
+    names = {field["name"] for field in fields}
+    rows = [record if isinstance(record, dict) else {"value": record} for record in records]
+    keys = set()
+    for row in rows:
+        _unseen_keys(row, names, keys)
+    if not keys:
+        return []
+
+    new_fields = []
+    flat_rows = [flatten_record(row) for row in rows]
+    for key in sorted(keys):
+        values = [row[key] for row in flat_rows if key in row]
+        observed = [value for value in values if value is not None]
+        field_type = resolve_json_type(set(json_value_types(values)))
+        new_fields.append({
+            "name": key,
+            "type": field_type,
+            "nullable": True,  # Missing from every record before it first appeared
+            "sample": observed[0] if observed else None,
+            "confidence": type_confidence(field_type, len(observed))
+        })
+    return new_fields
+
+
+def records_to_table(records, fields):
+    """Build an Arrow table with one column per schema field from decoded JSON records.
+
+    Nested objects are flattened into dotted columns ("address.city") with Arrow struct
+    kernels, one batch at a time. Integers, floats and booleans become native columns;
+    other values are stored as text, arrays as JSON, so every batch has the same schema.
+    Returns the table and, per column, the number of values that did not match the field
+    type (written as null).
+    """
+    rows = [record if isinstance(record, dict) else {"value": record} for record in records]
+    names = [field["name"] for field in fields]
+    # A key that also has dotted child columns holds objects in some records; those live in the children
+    parents = {name.rsplit(".", 1)[0] for name in names if "." in name}
+
+    # Infer each top-level key once for the whole batch and split structs into leaf columns
+    leaves = {}
+    for top in dict.fromkeys(name.split(".", 1)[0] for name in names):
+        try:
+            _flatten_struct(top, pa.array([row.get(top) for row in rows]), leaves)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+            continue  # Mixed values under this key are converted value by value below
+
+    columns = []
+    errors = {}
+    for field in fields:
+        name = field["name"]
+        field_type = field.get("type", "string")
+        column = _native_column(leaves[name], field_type) if name in leaves else None
+        if column is None:
+            values = [_lookup(row, name) for row in rows]
+            if name in parents:
+                values = [None if isinstance(value, dict) else value for value in values]
+            column, failed = _convert_values(values, field_type)
+            if failed:
+                errors[name] = failed
+        columns.append(column)
+
+    return pa.Table.from_arrays(columns, names=names), errors
@@ -0,0 +1,45 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """Pace a job to a maximum rows/sec and/or bytes/sec; without limits it never waits.
+
+    Callers report what they have just processed and the limiter sleeps until the totals
+    so far fit under the configured rates. Total time spent sleeping is kept in `waited`.
+    """
+
+    def __init__(self, rows_per_second=None, bytes_per_second=None):
+        self.rows_per_second = rows_per_second or None
+        self.bytes_per_second = bytes_per_second or None
+        self.rows = 0
+        self.bytes = 0
+        self.waited = 0.0
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.rows_per_second or self.bytes_per_second)
+
+    def consume(self, rows=0, nbytes=0):
+        """Account for processed rows and bytes, sleeping if the job is ahead of its rate"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.rows += rows
+            self.bytes += nbytes
+            # Earliest moment the totals so far are allowed to have been reached
+            due = 0.0
+            if self.rows_per_second:
+                due = max(due, self.rows / self.rows_per_second)
+            if self.bytes_per_second:
+                due = max(due, self.bytes / self.bytes_per_second)
+            delay = due - (time.monotonic() - self._started)
+            if delay > 0:
+                # Sleeping under the lock holds back concurrent extraction workers too
+                time.sleep(delay)
+                self.waited += delay
+
+    def metrics(self):
+        return {"throttle_wait_seconds": round(self.waited, 3)}
@@ -0,0 +1,56 @@
+"""Standalone ingestion worker node.
+
+Run with `python -m api.worker` from the repository root. The node claims queued jobs from the
+same metadata database as the API and runs them with the regular file and database pipelines,
+so uploads and the Parquet output directory must be on storage shared with the API. Set
+INGEST_EMBEDDED_SCHEDULER=false on the API to leave all ingestion to worker nodes.
+"""
+import argparse
+import logging
+import signal
+import threading
+
+from .datapuur import run_ingestion_job
+from .scheduler import IngestionScheduler, INGEST_MAX_WORKERS, SCHEDULER_POLL_SECONDS, LEASE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queued ingestion jobs outside the API process")
+    parser.add_argument("--workers", type=int, default=INGEST_MAX_WORKERS,
+                        help="Jobs run at the same time, one worker process each")
+    parser.add_argument("--poll-seconds", type=float, default=SCHEDULER_POLL_SECONDS,
+                        help="How often the queue is checked for new jobs")
+    parser.add_argument("--lease-seconds", type=float, default=LEASE_SECONDS,
+                        help="How long a claimed job survives without a heartbeat from this node")
+    parser.add_argument("--worker-id", default=None,
+                        help="Name recorded on claimed jobs (default: host:pid)")
+    args = parser.parse_args()
+
+    scheduler = IngestionScheduler(
+        run_ingestion_job,
+        max_workers=args.workers,
+        poll_seconds=args.poll_seconds,
+        worker_id=args.worker_id,
+        lease_seconds=args.lease_seconds
+    )
+
+    stopped = threading.Event()
+
+    def handle_signal(signum, frame):
+        logger.info(f"Received signal {signum}, stopping worker {scheduler.worker_id}")
+        stopped.set()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    scheduler.start()
+    while not stopped.wait(1):
+        pass
+    # Unfinished jobs go back to the queue and resume from their checkpoints on another node
+    scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
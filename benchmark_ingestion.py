@@ -0,0 +1,247 @@
+import argparse
+import csv
+import os
+import multiprocessing
+import random
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+from sqlalchemy import create_engine
+
+# Make the api package importable when running from the project root
+sys.path.append(str(Path(__file__).parent))
+
+from api.parquet_writer import ParquetChunkWriter
+from api.schema_inference import infer_csv_schema, open_csv_reader, read_csv_header, coerce_table
+from api.csv_ingest import ingest_csv_parallel
+from api.db_extract import reflect_table, iter_keyset_batches, plan_key_ranges, extract_ranges_parallel
+
+
+def make_csv(path, rows):
+    """Write a synthetic churn-style CSV with the given number of rows"""
+    random.seed(42)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["customerID", "tenure", "Contract", "MonthlyCharges", "TotalCharges", "SignupDate", "Churn"])
+        for i in range(rows):
+            tenure = random.randint(0, 72)
+            monthly = round(random.uniform(18, 120), 2)
+            writer.writerow([
+                f"C{i:08d}",
+                tenure,
+                random.choice(["Month-to-month", "One year", "Two year"]),
+                monthly,
+                round(monthly * tenure, 2),
+                f"20{random.randint(10, 23)}-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+                random.choice(["Yes", "No"]),
+            ])
+
+
+def timed(label, rows, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed:8.2f}s  {rows / elapsed:12,.0f} rows/s")
+    return elapsed
+
+
+def bench_parquet_writer(args, workdir):
+    """Legacy read-concat-rewrite loop vs the streaming row-group writer"""
+    csv_path = workdir / "input.csv"
+    make_csv(csv_path, args.rows)
+
+    def legacy():
+        output_file = workdir / "legacy.parquet"
+        for chunk in pd.read_csv(csv_path, chunksize=args.chunk_size, dtype=str, keep_default_na=False):
+            if os.path.exists(output_file):
+                combined_df = pd.concat([pd.read_parquet(output_file), chunk], ignore_index=True)
+                combined_df.to_parquet(output_file, index=False)
+            else:
+                chunk.to_parquet(output_file, index=False)
+
+    def streaming():
+        with ParquetChunkWriter(workdir / "streaming.parquet") as writer:
+            for chunk in pd.read_csv(csv_path, chunksize=args.chunk_size, dtype=str, keep_default_na=False):
+                writer.write_frame(chunk)
+
+    print(f"Parquet writer: {args.rows:,} rows, chunk_size={args.chunk_size}")
+    legacy_time = timed("read-concat-rewrite", args.rows, legacy)
+    streaming_time = timed("append row groups", args.rows, streaming)
+    print(f"  speedup: {legacy_time / streaming_time:.1f}x")
+
+
+def bench_db_parallel(args, workdir):
+    """Range-partitioned database extraction with a varying number of workers"""
+    csv_path = workdir / "input.csv"
+    make_csv(csv_path, args.rows)
+    engine = create_engine(args.source_url or f"sqlite:///{workdir / 'source.db'}", pool_size=args.workers + 1)
+    pd.read_csv(csv_path).rename_axis("id").reset_index().to_sql("churn", engine, index=False, if_exists="replace")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE UNIQUE INDEX churn_id ON churn (id)")
+
+    print(f"Parallel DB extraction: {args.rows:,} rows, chunk_size={args.chunk_size}")
+    with engine.connect() as conn:
+        table = reflect_table(conn, "churn")
+
+        def sequential():
+            with ParquetChunkWriter(workdir / "sequential.parquet") as writer:
+                for chunk in iter_keyset_batches(conn, table, ["id"], args.chunk_size):
+                    writer.write_frame(chunk)
+
+        timed("keyset, 1 connection", args.rows, sequential)
+
+        workers = 2
+        while workers <= args.workers:
+            ranges = plan_key_ranges(conn, table, "id", workers)
+
+            def parallel():
+                with ParquetChunkWriter(workdir / f"parallel_{workers}.parquet") as writer:
+                    extract_ranges_parallel(
+                        engine, table, ["id"], "id", ranges, args.chunk_size,
+                        lambda chunk, index: writer.write_frame(chunk), workers
+                    )
+
+            timed(f"{workers} range workers", args.rows, parallel)
+            workers *= 2
+    engine.dispose()
+
+
+def legacy_csv_types(file_path, rows):
+    """The per-cell try/except type detection that infer_csv_schema replaced"""
+    with open(file_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        headers = next(reader)
+        field_types = {header: set() for header in headers}
+        for count, row in enumerate(reader):
+            if count >= rows:
+                break
+            for header, value in zip(headers, row):
+                if not value:
+                    continue
+                for type_name, parse in (("integer", int), ("float", float)):
+                    try:
+                        parse(value)
+                        field_types[header].add(type_name)
+                        break
+                    except ValueError:
+                        pass
+                else:
+                    if value.lower() in ("true", "false"):
+                        field_types[header].add("boolean")
+                        continue
+                    for type_name, fmt in (("date", "%Y-%m-%d"), ("datetime", "%Y-%m-%dT%H:%M:%S")):
+                        try:
+                            datetime.strptime(value, fmt)
+                            field_types[header].add(type_name)
+                            break
+                        except ValueError:
+                            pass
+                    else:
+                        field_types[header].add("string")
+    return field_types
+
+
+def bench_schema_inference(args, workdir):
+    """Per-cell Python type detection vs vectorized Arrow inference"""
+    csv_path = workdir / "input.csv"
+    make_csv(csv_path, args.rows)
+
+    print(f"CSV schema inference: sample of {args.rows:,} rows")
+    legacy_time = timed("per-cell try/except", args.rows, lambda: legacy_csv_types(csv_path, args.rows))
+    vectorized_time = timed("vectorized Arrow", args.rows, lambda: infer_csv_schema(csv_path, args.rows))
+    print(f"  speedup: {legacy_time / vectorized_time:.1f}x")
+
+
+def bench_csv_parallel(args, workdir):
+    """Single-process typed CSV ingestion vs byte-range parsing in a process pool"""
+    csv_path = workdir / "input.csv"
+    make_csv(csv_path, args.rows)
+    fields = infer_csv_schema(csv_path)["fields"]
+    size_mb = os.path.getsize(csv_path) / (1 << 20)
+
+    def sequential():
+        with ParquetChunkWriter(workdir / "sequential.parquet") as writer:
+            for batch in open_csv_reader(csv_path, read_csv_header(csv_path)):
+                writer.write_table(coerce_table(pa.Table.from_batches([batch]), fields)[0])
+
+    print(f"Parallel CSV ingestion: {args.rows:,} rows ({size_mb:.1f} MB)")
+    timed("1 process", args.rows, sequential)
+
+    workers = 2
+    while workers <= args.workers:
+        def parallel():
+            with ParquetChunkWriter(workdir / f"parallel_{workers}.parquet") as writer:
+                # Small ranges so even modest row counts are spread over every worker
+                ingest_csv_parallel(csv_path, writer, fields, workers, range_bytes=max(int(size_mb * (1 << 20)) // (workers * 4), 1 << 16))
+
+        timed(f"{workers} worker processes", args.rows, parallel)
+        workers *= 2
+
+
+def pandas_engine(csv_path, output_file, fields, chunk_size):
+    with ParquetChunkWriter(output_file) as writer:
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_size, dtype=str, keep_default_na=False):
+            writer.write_table(coerce_table(pa.Table.from_pandas(chunk, preserve_index=False), fields)[0])
+
+
+def arrow_engine(csv_path, output_file, fields, chunk_size):
+    with ParquetChunkWriter(output_file) as writer:
+        for batch in open_csv_reader(csv_path, read_csv_header(csv_path)):
+            writer.write_table(coerce_table(pa.Table.from_batches([batch]), fields)[0])
+
+
+def run_measured(fn, *args):
+    """Run fn and report its wall time and the peak RSS of the process in MB"""
+    start = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - start
+    return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # ru_maxrss is in KB on Linux
+
+
+def bench_csv_engines(args, workdir):
+    """pandas vs Arrow CSV engines, each in a fresh process so peak RSS is not shared"""
+    csv_path = workdir / "input.csv"
+    make_csv(csv_path, args.rows)
+    fields = infer_csv_schema(csv_path)["fields"]
+
+    print(f"CSV engines: {args.rows:,} rows, chunk_size={args.chunk_size}")
+    for name, engine in (("pandas", pandas_engine), ("arrow", arrow_engine)):
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            elapsed, peak_mb = pool.submit(
+                run_measured, engine, csv_path, workdir / f"{name}.parquet", fields, args.chunk_size
+            ).result()
+        print(f"  {name:<28} {elapsed:8.2f}s  {args.rows / elapsed:12,.0f} rows/s  peak RSS {peak_mb:8.1f} MB")
+
+
+BENCHMARKS = {
+    "parquet-writer": bench_parquet_writer,
+    "db-parallel": bench_db_parallel,
+    "schema-inference": bench_schema_inference,
+    "csv-parallel": bench_csv_parallel,
+    "csv-engines": bench_csv_engines,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingestion pipeline benchmarks")
+    parser.add_argument("benchmarks", nargs="*", help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Maximum worker count to scale up to")
+    parser.add_argument("--source-url", help="SQLAlchemy URL of a scratch database for db-parallel (default: temporary SQLite)")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmark(s): {', '.join(unknown)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.benchmarks or BENCHMARKS:
+            BENCHMARKS[name](args, Path(tmp))
@@ -65,8 +65,8 @@ export function FileUpload({
     // Filter out unsupported file types
     const validFiles = newFiles.filter((file) => {
       const fileType = file.name.split(".").pop().toLowerCase()
-      if (fileType !== "csv" && fileType !== "json") {
-        setError(`File ${file.name} is not supported. Only CSV and JSON files are allowed.`)
+      if (fileType !== "csv" && fileType !== "json" && fileType !== "jsonl") {
+        setError(`File ${file.name} is not supported. Only CSV, JSON and JSON Lines files are allowed.`)
         return false
       }
 
@@ -236,7 +236,7 @@ export function FileUpload({
             type="file"
             className="hidden"
             onChange={handleChange}
-            accept=".csv,.json"
+            accept=".csv,.json,.jsonl"
             multiple
           />
           <motion.div whileHover={{ scale: 1.05 }} className="inline-block">
@@ -251,7 +251,7 @@ export function FileUpload({
               Select Files
             </Button>
             <div className="text-sm text-muted-foreground mt-2 sm:mt-0 sm:ml-2 flex items-center">
-              Supported formats: CSV, JSON
+              Supported formats: CSV, JSON, JSONL
             </div>
           </div>
         </div>
@@ -1,6 +1,6 @@
 "use client"
 
-import { useState, useEffect } from "react"
+import { useState, useEffect, useRef } from "react"
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs"
 import { Progress } from "@/components/ui/progress"
 import { Button } from "@/components/ui/button"
@@ -17,40 +17,83 @@ export function IngestionMonitor({ jobs, onJobUpdated, errors }) {
   const completedJobs = jobs.filter((job) => job.status === "completed")
   const failedJobs = jobs.filter((job) => job.status === "failed")
 
-  // Poll for job updates
+  // Latest jobs and callback for applying pushed updates, so neither restarts the stream on every update
+  const jobsRef = useRef(jobs)
+  jobsRef.current = jobs
+  const onJobUpdatedRef = useRef(onJobUpdated)
+  onJobUpdatedRef.current = onJobUpdated
+
+  // Only a change in which jobs are active opens a new stream
+  const activeJobIds = activeJobs.map((job) => job.id).join(",")
+
+  // Receive job updates pushed by the server instead of polling each job
   useEffect(() => {
-    if (!isPolling) return
+    if (!isPolling || !activeJobIds) return
 
-    const pollInterval = setInterval(async () => {
-      // Only poll for active jobs
-      const jobsToUpdate = jobs.filter((job) => job.status === "running" || job.status === "queued")
+    const controller = new AbortController()
+    let retryTimeout = null
 
-      if (jobsToUpdate.length === 0) {
-        return
+    const applyUpdate = (update) => {
+      const job = jobsRef.current.find((item) => item.id === update.id)
+      if (job && onJobUpdatedRef.current) {
+        onJobUpdatedRef.current({ ...job, ...update })
       }
+    }
 
+    const connect = async () => {
+      let done = false
       try {
-        for (const job of jobsToUpdate) {
-          const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL || "/api"}/datapuur/job-status/${job.id}`, {
+        const response = await fetch(
+          `${process.env.NEXT_PUBLIC_API_URL || "/api"}/datapuur/job-events?job_ids=${encodeURIComponent(activeJobIds)}`,
+          {
             headers: {
               Authorization: `Bearer ${localStorage.getItem("token")}`,
             },
-          })
+            signal: controller.signal,
+          },
+        )
+        if (!response.ok || !response.body) {
+          throw new Error(`Job event stream failed with status ${response.status}`)
+        }
 
-          if (response.ok) {
-            const updatedJob = await response.json()
-            if (onJobUpdated) {
-              onJobUpdated(updatedJob)
+        // Server-Sent Events: blocks separated by a blank line, with "event:" and "data:" fields
+        const reader = response.body.getReader()
+        const decoder = new TextDecoder()
+        let buffer = ""
+        while (!done) {
+          const { value, done: streamDone } = await reader.read()
+          if (streamDone) break
+          buffer += decoder.decode(value, { stream: true })
+          const blocks = buffer.split("\n\n")
+          buffer = blocks.pop()
+          for (const block of blocks) {
+            const lines = block.split("\n")
+            const event = lines.find((line) => line.startsWith("event: "))?.slice(7)
+            const data = lines.find((line) => line.startsWith("data: "))?.slice(6)
+            if (event === "done") {
+              done = true
+            } else if (event === "job" && data) {
+              applyUpdate(JSON.parse(data))
             }
           }
         }
       } catch (error) {
-        console.error("Error polling job status:", error)
+        if (controller.signal.aborted) return
+        console.error("Error receiving job updates:", error)
       }
-    }, 3000) // Poll every 3 seconds
+      // Reconnect if the stream dropped while jobs were still active
+      if (!done && !controller.signal.aborted) {
+        retryTimeout = setTimeout(connect, 3000)
+      }
+    }
 
-    return () => clearInterval(pollInterval)
-  }, [jobs, isPolling, onJobUpdated])
+    connect()
+
+    return () => {
+      controller.abort()
+      clearTimeout(retryTimeout)
+    }
+  }, [activeJobIds, isPolling])
 
   const getJobIcon = (type) => {
     switch (type) {
@@ -0,0 +1,67 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from api.csv_ingest import ingest_csv_parallel
+from api.parquet_writer import PartParquetWriter
+from api.schema_inference import coerce_table, infer_csv_schema, open_csv_reader, read_csv_header
+
+
+def write_csv(tmp_path, text):
+    path = tmp_path / "data.csv"
+    path.write_text(text)
+    return path
+
+
+def ingest_with_arrow(file_path, output_file):
+    """The arrow engine of file ingestion: header names, streamed batches, typed row groups"""
+    schema_fields = infer_csv_schema(file_path)["fields"]
+    headers = read_csv_header(file_path)
+    with open(file_path, 'rb') as csv_file, PartParquetWriter(output_file) as writer:
+        for batch in open_csv_reader(csv_file, headers):
+            table, _ = coerce_table(pa.Table.from_batches([batch]), schema_fields)
+            writer.write_table(table)
+        writer.finish()
+    return pq.read_table(output_file)
+
+
+def test_arrow_engine_output_with_repeated_headers_can_be_read_back(tmp_path):
+    path = write_csv(tmp_path, "a,a,,b\n1,x,2020-01-01,3\n4,y,2020-01-02,5\n")
+    table = ingest_with_arrow(path, tmp_path / "out.parquet")
+
+    assert table.column_names == ["a", "a.1", "Unnamed: 2", "b"]
+    assert table.column("a").to_pylist() == [1, 4]
+    assert table.column("a.1").to_pylist() == ["x", "y"]
+
+
+def test_float_values_widen_an_integer_column_instead_of_becoming_null(tmp_path):
+    fields = [{"name": "n", "type": "integer"}]
+    first, errors = coerce_table(pa.table({"n": ["1", "2"]}), fields)
+    assert errors == {}
+    second, errors = coerce_table(pa.table({"n": ["3", "4.5", "x"]}), fields)
+    assert second.column("n").type == pa.float64()
+    assert errors == {"n": 1}
+
+    output_file = tmp_path / "out.parquet"
+    with PartParquetWriter(output_file) as writer:
+        writer.write_table(first)
+        writer.write_table(second)
+        writer.write_table(first)
+        writer.finish()
+    table = pq.read_table(output_file)
+    assert table.column("n").type == pa.float64()
+    assert table.column("n").to_pylist() == [1.0, 2.0, 3.0, 4.5, None, 1.0, 2.0]
+
+
+def test_parallel_ingestion_of_a_header_only_file_writes_its_columns(tmp_path):
+    path = write_csv(tmp_path, "id,name\n")
+    output_file = tmp_path / "out.parquet"
+    schema_fields = [{"name": "id", "type": "integer"}, {"name": "name", "type": "string"}]
+    with PartParquetWriter(output_file) as writer:
+        rows, errors = ingest_csv_parallel(path, writer, schema_fields, workers=2)
+        writer.finish()
+
+    assert (rows, errors) == (0, {})
+    table = pq.read_table(output_file)
+    assert table.num_rows == 0
+    assert table.schema.names == ["id", "name"]
+    assert table.schema.field("id").type == pa.int64()
@@ -0,0 +1,48 @@
+from sqlalchemy import create_engine, text
+
+from api.db_extract import discover_key_columns, iter_keyset_batches, iter_offset_batches, reflect_table
+
+
+def make_engine(*statements):
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        for statement in statements:
+            conn.execute(text(statement))
+    return engine
+
+
+def test_non_unique_key_column_without_primary_key_is_not_used_for_seeking():
+    engine = make_engine(
+        "CREATE TABLE events (grp INTEGER NOT NULL, value INTEGER)",
+        "INSERT INTO events VALUES " + ", ".join(f"({i // 4}, {i})" for i in range(20)),
+    )
+    with engine.connect() as conn:
+        key_columns = discover_key_columns(conn, "events", "grp")
+        assert key_columns is None
+
+        table = reflect_table(conn, "events")
+        rows = sum(len(chunk) for chunk in iter_offset_batches(conn, table, 3))
+    assert rows == 20
+
+
+def test_non_unique_key_column_is_tie_broken_by_primary_key():
+    engine = make_engine(
+        "CREATE TABLE events (id INTEGER PRIMARY KEY, grp INTEGER NOT NULL)",
+        "INSERT INTO events VALUES " + ", ".join(f"({i}, {i // 4})" for i in range(20)),
+    )
+    with engine.connect() as conn:
+        key_columns = discover_key_columns(conn, "events", "grp")
+        assert key_columns == ["grp", "id"]
+
+        table = reflect_table(conn, "events")
+        ids = [
+            row for chunk in iter_keyset_batches(conn, table, key_columns, 3) for row in chunk["id"].tolist()
+        ]
+    assert sorted(ids) == list(range(20))
+
+
+def test_unique_key_column_without_primary_key_is_used():
+    engine = make_engine("CREATE TABLE events (code TEXT NOT NULL UNIQUE, value INTEGER)")
+    with engine.connect() as conn:
+        assert discover_key_columns(conn, "events", "code") == ["code"]
+        assert discover_key_columns(conn, "events") == ["code"]
@@ -0,0 +1,23 @@
+import json
+from datetime import date, datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from api.exports import export_parquet
+
+
+def test_json_export_writes_dates_as_iso_strings(tmp_path):
+    parquet_path = tmp_path / "job.parquet"
+    pq.write_table(pa.table({
+        "day": pa.array([date(2020, 1, 2), None], pa.date32()),
+        "at": pa.array([datetime(2020, 1, 2, 3, 4, 5), None], pa.timestamp("us")),
+        "n": [1, 2],
+    }), parquet_path)
+
+    output_path = tmp_path / "job.json"
+    assert export_parquet(parquet_path, output_path, "json") == "application/json"
+    records = json.loads(output_path.read_text())
+    assert records[0]["day"].startswith("2020-01-02")
+    assert records[0]["at"].startswith("2020-01-02T03:04:05")
+    assert records[1] == {"day": None, "at": None, "n": 2}
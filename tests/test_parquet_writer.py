@@ -0,0 +1,26 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from api.parquet_writer import PartParquetWriter
+
+
+@pytest.mark.parametrize("chunks", [1, 3])
+def test_finished_output_can_be_resumed_until_parts_are_removed(tmp_path, chunks):
+    output_file = tmp_path / "job.parquet"
+    with PartParquetWriter(output_file) as writer:
+        for index in range(chunks):
+            writer.write_table(pa.table({"n": [index, index]}))
+            committed = writer.commit()
+        writer.finish()
+    assert pq.read_table(output_file).num_rows == 2 * chunks
+
+    # A crash before the job's completion is recorded resumes from the last checkpoint
+    with PartParquetWriter(output_file, committed) as resumed:
+        assert resumed.schema.names == ["n"]
+        resumed.finish()
+    assert pq.read_table(output_file).column("n").to_pylist() == [i for i in range(chunks) for _ in range(2)]
+
+    resumed.remove_parts()
+    assert not resumed.parts_dir.exists()
+    assert pq.read_table(output_file).num_rows == 2 * chunks
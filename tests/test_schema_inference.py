@@ -0,0 +1,45 @@
+import io
+
+import pandas as pd
+import pyarrow as pa
+
+from api.schema_inference import empty_csv_table, infer_csv_schema, read_csv_header
+
+
+def write_csv(tmp_path, text, name="data.csv", encoding="utf-8"):
+    path = tmp_path / name
+    path.write_text(text, encoding=encoding)
+    return path
+
+
+def test_blank_and_repeated_headers_are_named_like_pandas(tmp_path):
+    for header in ["a,a,,b", "a,a.1,a,a", "x,,,x,x.1,x"]:
+        text = header + "\n" + ",".join("1" for _ in header.split(",")) + "\n"
+        path = write_csv(tmp_path, text)
+        assert read_csv_header(path) == list(pd.read_csv(io.StringIO(text)).columns)
+
+
+def test_byte_order_mark_is_dropped_from_the_first_header(tmp_path):
+    path = write_csv(tmp_path, "id,name\n1,x\n", encoding="utf-8-sig")
+    assert read_csv_header(path) == ["id", "name"]
+
+
+def test_empty_csv_table_has_the_typed_columns_of_the_schema():
+    fields = [{"name": "id", "type": "integer"}, {"name": "day", "type": "date"}, {"name": "name", "type": "string"}]
+    table = empty_csv_table(["id", "day", "name"], fields)
+
+    assert table.num_rows == 0
+    assert [field.type for field in table.schema] == [pa.int64(), pa.date32(), pa.string()]
+
+
+def test_types_of_a_fully_sampled_file_have_full_confidence(tmp_path):
+    path = write_csv(tmp_path, "n\n1\n2\n3\n")
+    for sampling in ["head", "stratified"]:
+        (field,) = infer_csv_schema(path, sample_rows=1000, sampling=sampling)["fields"]
+        assert (field["type"], field["confidence"]) == ("integer", 1.0)
+
+
+def test_types_of_a_partial_sample_keep_the_rule_of_three_bound(tmp_path):
+    path = write_csv(tmp_path, "n\n" + "".join(f"{i}\n" for i in range(100)))
+    (field,) = infer_csv_schema(path, sample_rows=30)["fields"]
+    assert (field["type"], field["confidence"]) == ("integer", 0.9)